@@ -3,11 +3,22 @@ import os
 from typing import Dict, Optional, List, Set
 from dotenv import load_dotenv
 
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.websockets import WebSocketState
 from pydantic import BaseModel
 
-from controller.state_models import StatusResponse, EmergencyInfo, SignalState, DecisionInfo, Road
+from controller.state_models import (
+    StatusResponse,
+    EmergencyInfo,
+    SignalState,
+    DecisionInfo,
+    Road,
+    TrafficCounts,
+    RoadVehicleCounts,
+)
 from controller.yolo_fake_generator import FakeYOLOGenerator
 from controller.traffic_controller import TrafficController
 from controller.memory_store import MemoryStore
@@ -15,7 +26,8 @@ from controller.memory_store import MemoryStore
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="Smart Traffic Backend", version="0.1.0")
+# orjson for HTTP responses too, matching the WebSocket broadcast path
+app = FastAPI(title="Smart Traffic Backend", version="0.1.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -45,17 +57,34 @@ class ConnectionManager:
     
     async def broadcast(self, data: dict):
         """Broadcast a message to all connected clients."""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(data)
-            except Exception as e:
-                print(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
-        
-        # Clean up disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
+        # Serialize once with orjson instead of per-client send_json;
+        # OPT_NON_STR_KEYS covers the Road enum keys in queues.
+        payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+        if not self.active_connections:
+            return
+
+        # Fan out concurrently: one slow client no longer stalls the others.
+        # Past 50 clients, yield between batches so one broadcast cannot
+        # monopolize the event loop. Skip already-closed sockets so normal
+        # disconnects do not pay the exception path.
+        clients = tuple(
+            c for c in self.active_connections
+            if c.application_state == WebSocketState.CONNECTED
+        )
+        for start in range(0, len(clients), 50):
+            batch = clients[start:start + 50]
+            results = await asyncio.gather(
+                *(connection.send_text(payload) for connection in batch),
+                return_exceptions=True,
+            )
+
+            # Clean up disconnected clients
+            for connection, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    print(f"Error broadcasting to client: {result}")
+                    self.disconnect(connection)
+            if start + 50 < len(clients):
+                await asyncio.sleep(0)
     
     def get_connection_count(self) -> int:
         """Return the number of active connections."""
@@ -65,9 +94,9 @@ class ConnectionManager:
 ws_manager = ConnectionManager()
 
 # Core simulation components
-memory_store = MemoryStore("data/memory.json")
-generator = FakeYOLOGenerator(emergency_at_sec=90, emergency_road=Road.south)
-controller = TrafficController(memory_store=memory_store)
+memory_store = MemoryStore("data/memory.jsonl")
+generator = FakeYOLOGenerator(emergency_at_sec=90, emergency_road=Road.j8_south_entry)
+controller = TrafficController()
 
 # Runtime state
 simulation_active: bool = False
@@ -75,25 +104,23 @@ _sim_task: Optional[asyncio.Task] = None
 _time_sec: int = 0
 _current_status: Optional[StatusResponse] = None
 
+# Built once at import time: get_status returns this until the first tick,
+# instead of re-validating a fresh StatusResponse per poll
+_IDLE_STATUS = StatusResponse(
+    time=0,
+    counts=TrafficCounts(**{road.value: RoadVehicleCounts() for road in Road}),
+    queues={road: 0 for road in Road},
+    signal=SignalState(greenRoad=controller.current_green, remaining=controller.remaining_green),
+    emergency=EmergencyInfo(active=False, road=None),
+    decision=DecisionInfo(method="idle", reason="simulation not started"),
+)
+
 class ControlResponse(BaseModel):
     status: str
 
 @app.get("/api/status", response_model=StatusResponse)
 async def get_status():
-    global _current_status
-    if _current_status is None:
-        # Initialize a default status if simulation hasn't started yet
-        initial_counts = generator.peek_counts()
-        queues = controller.compute_queues(initial_counts)
-        _current_status = StatusResponse(
-            time=_time_sec,
-            counts=initial_counts,
-            queues=queues,
-            signal=SignalState(greenRoad=controller.current_green, remaining=controller.remaining_green),
-            emergency=EmergencyInfo(active=False, road=None),
-            decision=DecisionInfo(method="idle", reason="simulation not started")
-        )
-    return _current_status
+    return _current_status or _IDLE_STATUS
 
 @app.get("/api/memory/summary")
 async def memory_summary():
@@ -1,19 +1,24 @@
 import asyncio
+import concurrent.futures
+import dataclasses
 import sys
 import os
-import json
 import logging
 from typing import Dict, Optional, List, Set
 from datetime import datetime
 from uuid import uuid4
 from dotenv import load_dotenv
 import time
+from time import monotonic
 
 import cv2
 import numpy as np
+import orjson
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.websockets import WebSocketState
 from pydantic import BaseModel
 
 from controller.state_models import (
@@ -30,6 +35,9 @@ from controller.state_models import (
     DetectionInfo,
     TrafficCounts,
     RoadVehicleCounts,
+    ManualInfo,
+    ROAD_ORDER,
+    ROAD_GETTERS,
 )
 from controller.sumo_connector import SUMOConnector
 from controller.traffic_controller import TrafficController
@@ -46,7 +54,12 @@ from db import mongo_client
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
-app = FastAPI(title="Smart Traffic Backend (SUMO)", version="0.3.0")
+# orjson for HTTP responses too, matching the WebSocket broadcast path
+app = FastAPI(
+    title="Smart Traffic Backend (SUMO)",
+    version="0.3.0",
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -66,32 +79,92 @@ logger = logging.getLogger(__name__)
 
 # === WebSocket Connection Manager ===
 
+# Clients per gather batch in event broadcasts; between batches the manager
+# yields the event loop so large fanouts cannot delay the tick.
+_BROADCAST_BATCH = 50
+
+
+class _ClientMailbox:
+    """Single-slot send queue for one client: holds only the newest status frame."""
+
+    __slots__ = ("latest", "wakeup", "task")
+
+    def __init__(self):
+        self.latest: Optional[str] = None
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
 class ConnectionManager:
     """Manages WebSocket connections and broadcasting"""
 
     def __init__(self):
         self.active_connections: Set[WebSocket] = set()
+        self._mailboxes: Dict[WebSocket, _ClientMailbox] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.add(websocket)
+        mailbox = _ClientMailbox()
+        mailbox.task = asyncio.create_task(self._drain_mailbox(websocket, mailbox))
+        self._mailboxes[websocket] = mailbox
         logger.info(f"Client connected. Total clients: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.discard(websocket)
+        mailbox = self._mailboxes.pop(websocket, None)
+        if mailbox and mailbox.task:
+            mailbox.task.cancel()
         logger.info(f"Client disconnected. Total clients: {len(self.active_connections)}")
 
-    async def broadcast_json(self, data: dict):
-        disconnected = []
-        for connection in list(self.active_connections):
-            try:
-                await connection.send_json(data)
-            except Exception as e:
-                logger.debug(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
-
-        for connection in disconnected:
-            self.disconnect(connection)
+    async def _drain_mailbox(self, websocket: WebSocket, mailbox: _ClientMailbox):
+        """Per-client sender. While a slow client blocks on send, newer status
+        frames overwrite the mailbox slot, so it never works through a backlog
+        of stale frames and cannot stall the broadcast path for anyone else."""
+        try:
+            while True:
+                await mailbox.wakeup.wait()
+                mailbox.wakeup.clear()
+                payload = mailbox.latest
+                if payload is not None:
+                    mailbox.latest = None
+                    await websocket.send_text(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Error broadcasting to client: {e}")
+            self.disconnect(websocket)
+
+    async def broadcast_json(self, data: dict, coalesce: bool = False):
+        # Serialize once for all clients; send_json would re-serialize per socket.
+        # OPT_NON_STR_KEYS handles the Road enum keys in the queues dict.
+        payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+        if coalesce:
+            # Status frames (latest-wins): drop into each client's mailbox.
+            for mailbox in self._mailboxes.values():
+                mailbox.latest = payload
+                mailbox.wakeup.set()
+            return
+        # Events must not be coalesced away, so send them directly. For large
+        # client counts, yield between batches so one broadcast cannot starve
+        # the simulation tick on the event loop. Skip sockets that already
+        # closed so normal disconnects do not pay the exception path.
+        clients = tuple(
+            c for c in self.active_connections
+            if c.application_state == WebSocketState.CONNECTED
+        )
+        for start in range(0, len(clients), _BROADCAST_BATCH):
+            batch = clients[start:start + _BROADCAST_BATCH]
+            results = await asyncio.gather(
+                *(connection.send_text(payload) for connection in batch),
+                return_exceptions=True,
+            )
+            for connection, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logger.debug(f"Error broadcasting to client: {result}")
+                    self.disconnect(connection)
+            if start + _BROADCAST_BATCH < len(clients):
+                await asyncio.sleep(0)
 
     def get_connection_count(self) -> int:
         return len(self.active_connections)
@@ -165,6 +238,12 @@ BASE_DIR = os.path.dirname(__file__)
 # MongoDB Injection Config
 SUMO_USE_MONGO_INJECTION = os.getenv("SUMO_USE_MONGO_INJECTION", "true").lower() == "true"
 SUMO_USE_STATIC_FLOWS = os.getenv("SUMO_USE_STATIC_FLOWS", "false").lower() == "true"
+# Simulation ticks per wall-clock second. 1.0 keeps the real-time 1 Hz
+# behavior; higher values run replays/backtests faster, with WebSocket
+# status broadcasts throttled to at most ~10 Hz so clients are not flooded.
+SUMO_SIM_SPEED = max(0.1, float(os.getenv("SUMO_SIM_SPEED", "1.0")))
+_TICK_INTERVAL = 1.0 / SUMO_SIM_SPEED
+_BROADCAST_EVERY_TICKS = max(1, round(SUMO_SIM_SPEED / 10.0))
 
 SUMO_CFG_ENV = os.getenv("SUMO_CFG_PATH", "sumo_configs/3junctions.sumocfg")
 if not SUMO_USE_STATIC_FLOWS and "3junctions.sumocfg" in SUMO_CFG_ENV:
@@ -235,7 +314,7 @@ EMERGENCY_POPUP_REQUIRE_ACK = os.getenv("EMERGENCY_POPUP_REQUIRE_ACK", "true").l
 
 # === Core components ===
 
-memory_store = MemoryStore("data/memory.json")
+memory_store = MemoryStore("data/memory.jsonl")
 sumo_connector = None
 sumo_injector: Optional[MongoSumoInjector] = None
 controller: Optional[TrafficController] = None
@@ -474,7 +553,7 @@ def _describe_manual_command(command: Optional[str]) -> str:
 
 def _get_manual_remaining(current_time: Optional[float] = None) -> int:
     if current_time is None:
-        current_time = time.time()
+        current_time = monotonic()
     if manual_mode == "MANUAL" and manual_until is not None:
         return max(0, int(manual_until - current_time))
     return 0
@@ -489,30 +568,44 @@ def _cancel_manual_state() -> None:
 
 def _manual_expired(current_time: Optional[float] = None) -> bool:
     if current_time is None:
-        current_time = time.time()
+        current_time = monotonic()
     return manual_mode == "MANUAL" and manual_until is not None and current_time >= manual_until
 
 
+# Built once at import; _apply_manual_phase looks commands up here every tick
+# during manual mode instead of rebuilding the mapping per call.
+_MANUAL_DISPLAY_GROUPS: Dict[str, List[Road]] = {
+    "NS_GREEN": [Road.j1_north_entry, Road.j8_north_entry, Road.j8_south_entry],
+    "EW_GREEN": [Road.j8_east_entry, Road.west_entry],
+    "N_ONLY": [Road.j1_north_entry, Road.j8_north_entry],
+    "E_ONLY": [Road.j8_east_entry],
+    "S_ONLY": [Road.j8_south_entry],
+    "W_ONLY": [Road.west_entry],
+    "CLEAR_N": [Road.j1_north_entry, Road.j8_north_entry],
+    "CLEAR_E": [Road.j8_east_entry],
+    "CLEAR_S": [Road.j8_south_entry],
+    "CLEAR_W": [Road.west_entry],
+    "BLOCK_N": [Road.j8_east_entry, Road.west_entry, Road.j8_south_entry],
+    "BLOCK_S": [Road.j8_east_entry, Road.west_entry, Road.j1_north_entry, Road.j8_north_entry],
+    "BLOCK_NS": [Road.j8_east_entry, Road.west_entry],
+    "BLOCK_E": [Road.j1_north_entry, Road.j8_north_entry, Road.j8_south_entry, Road.west_entry],
+    "BLOCK_W": [Road.j1_north_entry, Road.j8_north_entry, Road.j8_south_entry, Road.j8_east_entry],
+    "BLOCK_EW": [Road.j1_north_entry, Road.j8_north_entry, Road.j8_south_entry],
+}
+
+
+# Per-command alternation map (current green -> next green). Only the lead
+# road maps forward; anything else falls back to group[0], matching the old
+# if/else toggle exactly.
+_MANUAL_NEXT_GREEN: Dict[str, Dict[Road, Road]] = {
+    cmd: {group[0]: group[1]}
+    for cmd, group in _MANUAL_DISPLAY_GROUPS.items()
+    if len(group) > 1
+}
+
+
 def _manual_command_display_group(command: Optional[str]):
-    mapping = {
-        "NS_GREEN": [Road.j1_north_entry, Road.j8_north_entry, Road.j8_south_entry],
-        "EW_GREEN": [Road.j8_east_entry, Road.west_entry],
-        "N_ONLY": [Road.j1_north_entry, Road.j8_north_entry],
-        "E_ONLY": [Road.j8_east_entry],
-        "S_ONLY": [Road.j8_south_entry],
-        "W_ONLY": [Road.west_entry],
-        "CLEAR_N": [Road.j1_north_entry, Road.j8_north_entry],
-        "CLEAR_E": [Road.j8_east_entry],
-        "CLEAR_S": [Road.j8_south_entry],
-        "CLEAR_W": [Road.west_entry],
-        "BLOCK_N": [Road.j8_east_entry, Road.west_entry, Road.j8_south_entry],
-        "BLOCK_S": [Road.j8_east_entry, Road.west_entry, Road.j1_north_entry, Road.j8_north_entry],
-        "BLOCK_NS": [Road.j8_east_entry, Road.west_entry],
-        "BLOCK_E": [Road.j1_north_entry, Road.j8_north_entry, Road.j8_south_entry, Road.west_entry],
-        "BLOCK_W": [Road.j1_north_entry, Road.j8_north_entry, Road.j8_south_entry, Road.j8_east_entry],
-        "BLOCK_EW": [Road.j1_north_entry, Road.j8_north_entry, Road.j8_south_entry],
-    }
-    return mapping.get(command, None)
+    return _MANUAL_DISPLAY_GROUPS.get(command, None)
 
 
 def _apply_manual_phase(current_time: float, time_sec: int) -> DecisionInfo:
@@ -540,10 +633,7 @@ def _apply_manual_phase(current_time: float, time_sec: int) -> DecisionInfo:
         ctrl.remaining_green = max(1, remaining)
         ctrl._since_last_decision = 0
     elif needs_switch:
-        if ctrl.current_green == group[0]:
-            ctrl.current_green = group[1]
-        else:
-            ctrl.current_green = group[0]
+        ctrl.current_green = _MANUAL_NEXT_GREEN[manual_command].get(ctrl.current_green, group[0])
         ctrl.remaining_green = min(30, max(1, remaining))
         ctrl._since_last_decision = 0
 
@@ -553,12 +643,57 @@ def _apply_manual_phase(current_time: float, time_sec: int) -> DecisionInfo:
     )
 
 
+# === Metrics log writer ===
+#
+# Log entries are queued and written by a single background task holding one
+# buffered append handle, so the 1 Hz tick path never touches the disk.
+
+_log_queue: "asyncio.Queue[dict]" = asyncio.Queue()
+_log_task: Optional[asyncio.Task] = None
+_LOG_FLUSH_MAX_ENTRIES = 64
+_LOG_FLUSH_INTERVAL_SEC = 0.1
+
+# Per-second cache for log timestamps: entries are written at 1 Hz, so the
+# formatted string only changes once per wall-clock second.
+_last_ts_sec: int = -1
+_last_ts_str: str = ""
+
+
+def _log_timestamp() -> str:
+    """ISO-8601 UTC timestamp, reformatted only when the second rolls over."""
+    global _last_ts_sec, _last_ts_str
+    sec = int(time.time())
+    if sec != _last_ts_sec:
+        _last_ts_str = datetime.utcfromtimestamp(sec).isoformat()
+        _last_ts_sec = sec
+    return _last_ts_str
+
+
+async def _log_writer_task():
+    """Drain _log_queue into the metrics log, flushing every N entries or 100 ms."""
+    buf: List[bytes] = []
+    last_flush = monotonic()
+    with open(METRICS_LOG_PATH, "ab", buffering=1 << 16) as f:
+        while True:
+            try:
+                entry = await asyncio.wait_for(_log_queue.get(), timeout=_LOG_FLUSH_INTERVAL_SEC)
+                buf.append(orjson.dumps(entry))
+            except asyncio.TimeoutError:
+                pass
+            now = monotonic()
+            if buf and (len(buf) >= _LOG_FLUSH_MAX_ENTRIES or now - last_flush >= _LOG_FLUSH_INTERVAL_SEC):
+                f.write(b"\n".join(buf) + b"\n")
+                f.flush()
+                buf.clear()
+                last_flush = now
+
+
 def _log_metrics(time_sec: int, metrics: RoadMetricsSet, signal_state: SignalState, predictions: Optional[Dict] = None):
     try:
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _log_timestamp(),
             "simulation_time": time_sec,
-            "metrics": metrics.dict(),
+            "metrics": dataclasses.asdict(metrics),
             "signal": {
                 "green_road": signal_state.greenRoad.value,
                 "remaining_seconds": signal_state.remaining,
@@ -567,16 +702,18 @@ def _log_metrics(time_sec: int, metrics: RoadMetricsSet, signal_state: SignalSta
 
         if predictions:
             log_entry["predictions"] = {}
-            for road, pred in predictions.items():
-                log_entry["predictions"][road.value] = {
+            for road, name in ROAD_ORDER:
+                pred = predictions.get(road)
+                if pred is None:
+                    continue
+                log_entry["predictions"][name] = {
                     "queue_trend": pred.get("queue_trend", "stable"),
                     "heavy_traffic_probability": pred.get("heavy_traffic_probability", 0.0),
                     "congestion_level": pred.get("congestion_level", "LOW"),
                     "predicted_eta_clear_seconds": pred.get("predicted_eta_clear_seconds", 0),
                 }
 
-        with open(METRICS_LOG_PATH, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        _log_queue.put_nowait(log_entry)
     except Exception as e:
         print(f"Warning: Could not log metrics: {e}")
 
@@ -640,7 +777,7 @@ async def _insert_accident_record_to_mongo(confidence: float, area: str):
 async def _trigger_accident_workflow(confidence: float, area: str):
     global manual_mode, manual_command, manual_until, last_accident_trigger_time
 
-    now_ts = time.time()
+    now_ts = monotonic()
     if (now_ts - last_accident_trigger_time) < ACCIDENT_TRIGGER_COOLDOWN_SEC:
         return
 
@@ -887,7 +1024,7 @@ async def resolve_alert(alert_id: str):
 
 @app.get("/api/control/mode", response_model=ModeResponse)
 async def get_control_mode():
-    current_time = time.time()
+    current_time = monotonic()
     remaining = _get_manual_remaining(current_time)
     return ModeResponse(
         mode=manual_mode,
@@ -899,7 +1036,7 @@ async def get_control_mode():
 
 @app.post("/api/control/mode", response_model=ModeResponse)
 async def set_control_mode(request: ModeRequest):
-    current_time = time.time()
+    current_time = monotonic()
 
     if request.mode not in ["AUTO", "MANUAL"]:
         raise HTTPException(status_code=400, detail="Mode must be 'AUTO' or 'MANUAL'")
@@ -933,7 +1070,7 @@ async def set_control_mode(request: ModeRequest):
 
 @app.post("/api/control/manual/apply", response_model=ManualApplyResponse)
 async def apply_manual_control(request: ManualApplyRequest):
-    current_time = time.time()
+    current_time = monotonic()
 
     if manual_mode != "MANUAL":
         raise HTTPException(
@@ -1008,7 +1145,7 @@ async def cancel_manual_control():
 
 @app.post("/api/control/manual/quick", response_model=ManualApplyResponse)
 async def quick_manual_control(request: QuickManualRequest):
-    current_time = time.time()
+    current_time = monotonic()
 
     direction_map = {
         "NS": "NS_GREEN",
@@ -1065,7 +1202,7 @@ async def quick_manual_control(request: QuickManualRequest):
 def _log_manual_event(event_type: str, mode: str, command: Optional[str], duration: int, reason: str):
     try:
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _log_timestamp(),
             "simulation_time": _time_sec,
             "event_type": event_type,
             "mode": mode,
@@ -1074,8 +1211,7 @@ def _log_manual_event(event_type: str, mode: str, command: Optional[str], durati
             "reason": reason,
         }
 
-        with open(METRICS_LOG_PATH, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        _log_queue.put_nowait(log_entry)
     except Exception as e:
         print(f"Warning: Could not log manual event: {e}")
 
@@ -1091,16 +1227,8 @@ async def _insert_vehicle_counts_to_mongo(time_sec: int, counts: TrafficCounts):
         return
 
     try:
-        road_to_entry_point = {
-            Road.west_entry: "west_entry",
-            Road.j1_north_entry: "j1_north_entry",
-            Road.j8_north_entry: "j8_north_entry",
-            Road.j8_east_entry: "j8_east_entry",
-            Road.j8_south_entry: "j8_south_entry",
-        }
-
-        for road, entry_point in road_to_entry_point.items():
-            road_counts = getattr(counts, road.value)
+        for (road, entry_point), get_road in zip(ROAD_ORDER, ROAD_GETTERS):
+            road_counts = get_road(counts)
             print(
                 f"[MONGO FUNC] Road {entry_point}: bike={road_counts.bike}, bus={road_counts.bus}, "
                 f"lorry={road_counts.lorry}, car={road_counts.car}, truck={road_counts.truck}, auto={road_counts.auto}"
@@ -1227,7 +1355,12 @@ async def stop_simulation():
         _sim_task = None
 
     if sumo_connector:
-        sumo_connector.disconnect()
+        # Close TraCI on the executor thread so it serializes after any
+        # in-flight prefetched pipeline step; nulling the global before that
+        # step finishes would let it race a closed connection.
+        await asyncio.get_running_loop().run_in_executor(
+            _sumo_executor, sumo_connector.disconnect
+        )
         sumo_connector = None
 
     road_provider = None
@@ -1312,11 +1445,10 @@ async def get_analytics_trend(minutes: int = 60):
 async def ws_live(websocket: WebSocket):
     await ws_manager.connect(websocket)
     try:
+        # Block on receive with no timeout: the coroutine wakes only on a
+        # client message or disconnect instead of a timer per client.
         while True:
-            try:
-                await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
-            except asyncio.TimeoutError:
-                continue
+            await websocket.receive_text()
     except WebSocketDisconnect:
         ws_manager.disconnect(websocket)
     except Exception as e:
@@ -1329,17 +1461,14 @@ def _convert_predictions_to_prediction_set(predictions: Optional[Dict]) -> Predi
         return PredictionSet()
 
     def to_metrics(pred_dict: dict) -> PredictionMetrics:
-        return PredictionMetrics(
-            queue_trend=pred_dict.get("queue_trend", "stable"),
-            arrivals_10s=pred_dict.get("arrivals_10s", 0.0),
-            arrivals_30s=pred_dict.get("arrivals_30s", 0.0),
-            heavy_traffic_probability=pred_dict.get("heavy_traffic_probability", 0.0),
-            congestion_level=pred_dict.get("congestion_level", "LOW"),
-            predicted_eta_clear_seconds=pred_dict.get("predicted_eta_clear_seconds", 0),
-        )
+        # predictor.predict always emits the full key set, so construct
+        # directly instead of chaining per-key .get() lookups
+        if not pred_dict:
+            return PredictionMetrics()
+        return PredictionMetrics(**pred_dict)
 
     return PredictionSet(
-        **{road.value: to_metrics(predictions.get(road, {})) for road in Road}
+        **{name: to_metrics(predictions.get(road, {})) for road, name in ROAD_ORDER}
     )
 
 
@@ -1347,11 +1476,55 @@ async def _broadcast_update(status: StatusResponse):
     base_status = status.dict()
     base_status["accident"] = _build_accident_payload()
     base_status["surveillance_emergency"] = emergency_state
-    await ws_manager.broadcast_json(base_status)
+    await ws_manager.broadcast_json(base_status, coalesce=True)
 
 
 # === Main simulation loop ===
 
+# Single worker so all TraCI traffic stays on one thread; running the SUMO
+# step off the event loop keeps HTTP/WebSocket handlers responsive mid-tick.
+_sumo_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="sumo")
+
+
+def _pipeline_step():
+    """Synchronous SUMO/metrics portion of one tick (runs on _sumo_executor)."""
+    sumo_connector.step()
+
+    road_counts_dict = road_provider.get_counts()
+    metadata = road_provider.get_metadata()
+
+    counts_kwargs = {}
+    for road, name in ROAD_ORDER:
+        counts_kwargs[name] = RoadVehicleCounts(**road_counts_dict.get(name, {}))
+    counts = TrafficCounts(**counts_kwargs)
+
+    if SUMO_USE_MONGO_INJECTION and sumo_injector:
+        try:
+            sumo_injector.inject_pending_vehicles()
+        except Exception as e:
+            logger.error(f"[INJECTOR] Error during injection step: {e}")
+
+    emergency = sumo_connector.detect_emergency()
+    queues = _get_controller().compute_queues(counts)
+    metrics = sumo_connector.compute_metrics()
+    predictions = predictor.predict(metrics)
+
+    return counts, metadata, emergency, queues, metrics, predictions
+
+
+def _consume_orphaned_step(fut: "asyncio.Future") -> None:
+    """Retrieve an abandoned pipeline-step future's outcome.
+
+    Called for the prefetched step left in flight when _run_loop exits, so a
+    TraCI error from it is logged rather than warned about as never
+    retrieved."""
+    if fut.cancelled():
+        return
+    exc = fut.exception()
+    if exc is not None:
+        logger.debug(f"Orphaned pipeline step failed: {exc}")
+
+
 async def _run_loop():
     global _time_sec, _current_status, simulation_active, sumo_connector, road_provider
     global manual_mode, manual_command, manual_until
@@ -1363,6 +1536,7 @@ async def _run_loop():
     ctrl.reset()
     predictor.reset()
     _time_sec = 0
+    pending_step: Optional[asyncio.Future] = None
 
     try:
         global road_provider
@@ -1377,28 +1551,32 @@ async def _run_loop():
                 road_provider = RoadHybridProvider(fake_provider, yolo_source)
                 logger.info(f"[INIT] Road provider: HYBRID (Camera={USE_CAMERA_WEST}, Fake={not USE_CAMERA_WEST})")
 
-        while simulation_active and sumo_connector.is_running():
-            current_real_time = time.time()
-
-            # 1) Step SUMO
-            sumo_connector.step()
-
-            # 2) Get vehicle counts
-            road_counts_dict = road_provider.get_counts()
-            metadata = road_provider.get_metadata()
-
-            # Dynamic build
-            counts_kwargs = {}
-            for road in Road:
-                counts_kwargs[road.value] = RoadVehicleCounts(**road_counts_dict.get(road.value, {}))
-            counts = TrafficCounts(**counts_kwargs)
-
-            # 2.5) Inject from Mongo if enabled
-            if SUMO_USE_MONGO_INJECTION and sumo_injector:
-                try:
-                    sumo_injector.inject_pending_vehicles()
-                except Exception as e:
-                    logger.error(f"[INJECTOR] Error during injection step: {e}")
+        loop = asyncio.get_running_loop()
+
+        # Software-pipelined stepping: each iteration consumes the tick
+        # prefetched by the previous one and schedules the next tick right
+        # before the pacing sleep, so SUMO steps during the idle second
+        # instead of adding to the iteration's latency. The executor is
+        # single-threaded, so the prefetched step is FIFO-ordered after the
+        # current tick's phase command and all TraCI traffic stays serialized.
+        pending_step = loop.run_in_executor(_sumo_executor, _pipeline_step)
+
+        while simulation_active:
+            current_real_time = monotonic()
+
+            # 1-6) Results of the SUMO/metrics pipeline tick prefetched on
+            # the previous iteration (or just scheduled, on the first one)
+            (
+                counts,
+                metadata,
+                emergency,
+                queues,
+                metrics,
+                predictions,
+            ) = await pending_step
+
+            if not sumo_connector.is_running():
+                break
 
             # Insert vehicle counts to Mongo (logging current state)
             try:
@@ -1409,30 +1587,17 @@ async def _run_loop():
             west_source = metadata.get("west_source", "fake")
 
             if _time_sec % 2 == 0:
-                west_total = sum(counts.west_entry.dict().values())
+                west_counts = dataclasses.asdict(counts.west_entry)
+                west_total = sum(west_counts.values())
                 logger.info(
                     f"[WEST INPUT] t={_time_sec}, using_camera={metadata.get('camera_ok', False)}, "
-                    f"west_source={west_source}, west_counts={counts.west_entry.dict()}, total={west_total}"
+                    f"west_source={west_source}, west_counts={west_counts}, total={west_total}"
                 )
 
-            emergency = sumo_connector.detect_emergency()
-
             # 2.6) Accident detection from WEST camera frame is now handled by independent background task.
 
-            # 3) Update tracking
-            sumo_connector._update_vehicle_tracking()
-
-            # 4) Compute queues
-            queues = controller.compute_queues(counts)
-
-            # 5) Compute metrics
-            metrics = sumo_connector.compute_metrics()
-
-            # 6) Predictions
-            predictions = predictor.predict(metrics)
-
             # 6.5) Auto alerts
-            current_real_time_for_alerts = time.time()
+            current_real_time_for_alerts = current_real_time
 
             camera_ok = data_provider.get_health_status().get("camera_ok", True)
             if not camera_ok and (current_real_time_for_alerts - _last_camera_alert_time) > _camera_alert_cooldown_sec:
@@ -1489,74 +1654,96 @@ async def _run_loop():
             else:
                 decision_info.reason = f"{decision_info.reason} [west_source=sumo]"
 
-            # 8) Send phase command
+            # 8) Send phase command (on the SUMO executor thread, like the step)
             effective_manual_command = _get_effective_manual_command(manual_command)
             if manual_mode == "MANUAL" and effective_manual_command and not emergency.active:
-                sumo_connector.apply_manual_command(effective_manual_command, max(1, ctrl.remaining_green))
+                await loop.run_in_executor(
+                    _sumo_executor,
+                    sumo_connector.apply_manual_command,
+                    effective_manual_command,
+                    max(1, ctrl.remaining_green),
+                )
             else:
-                sumo_connector.set_green_phase(ctrl.current_green, max(1, ctrl.remaining_green))
-
-            # 9) Manual info
-            from controller.state_models import ManualInfo
-            manual_info = ManualInfo(
-                active=(manual_mode == "MANUAL"),
-                command=manual_command,
-                remaining_seconds=_get_manual_remaining(current_real_time),
-            )
+                await loop.run_in_executor(
+                    _sumo_executor,
+                    sumo_connector.set_green_phase,
+                    ctrl.current_green,
+                    max(1, ctrl.remaining_green),
+                )
 
-            # 9a) Input health
-            input_health = InputHealthInfo(**provider.get_health_status())
+            # 9-13) Build + broadcast the status object only when someone will
+            # consume it: a connected WS client or the periodic log tick.
+            # Otherwise keep the previous _current_status (at most one decision
+            # cycle stale for HTTP pollers) and skip all the construction work.
+            is_log_tick = _time_sec % controller.decision_cycle == 0
+            is_broadcast_tick = _time_sec % _BROADCAST_EVERY_TICKS == 0
+            need_status = (bool(ws_manager.active_connections) and is_broadcast_tick) or is_log_tick
+
+            if need_status:
+                # 9) Manual info
+                manual_info = ManualInfo(
+                    active=(manual_mode == "MANUAL"),
+                    command=manual_command,
+                    remaining_seconds=_get_manual_remaining(current_real_time),
+                )
 
-            # 10) Actual SUMO state
-            actual_green_info = sumo_connector.get_actual_green_info()
+                # 9a) Input health
+                input_health = InputHealthInfo(**provider.get_health_status())
 
-            # 10.5) WEST camera info
-            camera_info_dict = provider.get_camera_info()
-            west_camera = WestCameraInfo(
-                camera_ok=camera_info_dict["camera_ok"],
-                last_frame_ts=camera_info_dict["last_frame_ts"],
-                detections=[DetectionInfo(**d) for d in camera_info_dict["detections"]],
-                using_fake_fallback=camera_info_dict["using_fake_fallback"],
-            )
+                # 10) Actual SUMO state
+                actual_green_info = sumo_connector.get_actual_green_info()
 
-            if _time_sec % 2 == 0:
-                west_total = sum(counts.west_entry.dict().values())
-                logger.info(f"[STATUS_BUILD] t={_time_sec}, WEST_total={west_total}, WEST_counts={counts.west_entry.dict()}")
+                # 10.5) WEST camera info
+                camera_info_dict = provider.get_camera_info()
+                west_camera = WestCameraInfo(
+                    camera_ok=camera_info_dict["camera_ok"],
+                    last_frame_ts=camera_info_dict["last_frame_ts"],
+                    detections=[DetectionInfo(**d) for d in camera_info_dict["detections"]],
+                    using_fake_fallback=camera_info_dict["using_fake_fallback"],
+                )
 
-            # 11) Build status object
-            _current_status = StatusResponse(
-                time=_time_sec,
-                counts=counts,
-                queues=queues,
-                signal=SignalState(greenRoad=ctrl.current_green, remaining=ctrl.remaining_green),
-                emergency=emergency,
-                decision=decision_info,
-                metrics=metrics,
-                prediction=_convert_predictions_to_prediction_set(predictions),
-                mode=manual_mode,
-                manual=manual_info,
-                inputs=input_health,
-                west_camera=west_camera,
-                sumo_phase_index=actual_green_info["sumo_phase_index"],
-                sumo_tls_state=actual_green_info["sumo_tls_state"],
-                actual_green_group=actual_green_info["actual_green_group"],
-                actual_green_roads=actual_green_info["actual_green_roads"],
-            )
+                if _time_sec % 2 == 0:
+                    west_counts = dataclasses.asdict(counts.west_entry)
+                    west_total = sum(west_counts.values())
+                    logger.info(f"[STATUS_BUILD] t={_time_sec}, WEST_total={west_total}, WEST_counts={west_counts}")
+
+                # 11) Build status object. Every field below is already a
+                # typed instance, so skip Pydantic validation on this 1 Hz
+                # path; requests hitting the API boundary still validate.
+                _current_status = StatusResponse.model_construct(
+                    time=_time_sec,
+                    counts=counts,
+                    queues=queues,
+                    signal=SignalState(greenRoad=ctrl.current_green, remaining=ctrl.remaining_green),
+                    emergency=emergency,
+                    decision=decision_info,
+                    metrics=metrics,
+                    prediction=_convert_predictions_to_prediction_set(predictions),
+                    mode=manual_mode,
+                    manual=manual_info,
+                    inputs=input_health,
+                    west_camera=west_camera,
+                    sumo_phase_index=actual_green_info["sumo_phase_index"],
+                    sumo_tls_state=actual_green_info["sumo_tls_state"],
+                    actual_green_group=actual_green_info["actual_green_group"],
+                    actual_green_roads=actual_green_info["actual_green_roads"],
+                )
 
-            # 12) Log metrics
-            if _time_sec % controller.decision_cycle == 0:
-                _log_metrics(_time_sec, metrics, _current_status.signal, predictions)
+                # 12) Log metrics
+                if is_log_tick:
+                    _log_metrics(_time_sec, metrics, _current_status.signal, predictions)
 
-            # 13) Broadcast
-            await _broadcast_update(_current_status)
+                # 13) Broadcast
+                await _broadcast_update(_current_status)
 
-            # 14) Tick
+            # 14) Tick — prefetch the next pipeline step so it overlaps the sleep
             _time_sec += 1
-            await asyncio.sleep(1)
+            pending_step = loop.run_in_executor(_sumo_executor, _pipeline_step)
+            await asyncio.sleep(_TICK_INTERVAL)
 
         simulation_active = False
         if sumo_connector:
-            sumo_connector.disconnect()
+            await loop.run_in_executor(_sumo_executor, sumo_connector.disconnect)
 
     except asyncio.CancelledError:
         pass
@@ -1565,14 +1752,28 @@ async def _run_loop():
         logger.error("Simulation loop crashed", exc_info=True)
         simulation_active = False
         if sumo_connector:
-            sumo_connector.disconnect()
+            await asyncio.get_running_loop().run_in_executor(
+                _sumo_executor, sumo_connector.disconnect
+            )
+    finally:
+        # Retrieve the prefetched step so its exception (if any) is consumed
+        # instead of surfacing as "exception was never retrieved"; executor
+        # futures cannot be interrupted once running, so a late finisher is
+        # handled by the callback while disconnects queue behind it FIFO.
+        if pending_step is not None:
+            if pending_step.done():
+                _consume_orphaned_step(pending_step)
+            else:
+                pending_step.add_done_callback(_consume_orphaned_step)
 
 
 @app.on_event("startup")
 async def startup_event():
-    global _accident_task
+    global _accident_task, _log_task
     logger.info("Starting accident detection background task")
     _accident_task = asyncio.create_task(_accident_detection_loop())
+    logger.info("Starting metrics log writer background task")
+    _log_task = asyncio.create_task(_log_writer_task())
 
 import uuid
 
@@ -1589,7 +1790,7 @@ async def _accident_detection_loop():
     
     while True:
         try:
-            current_time = time.time()
+            current_time = monotonic()
             frame_bytes = None
             frame_bgr = None
             
@@ -1728,4 +1929,12 @@ async def ack_emergency():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+
+    try:
+        import uvloop  # noqa: F401  (not available on Windows)
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "asyncio"
+
+    # http="auto" picks the httptools parser when installed
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=loop_impl, http="auto", ws="websockets")
\ No newline at end of file
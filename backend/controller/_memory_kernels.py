@@ -0,0 +1,66 @@
+"""
+Scoring kernels for MemoryStore similarity search.
+
+When numba is installed the kernel is JIT-compiled (parallel, fastmath) into
+a single fused loop over all records; otherwise a NumPy implementation with
+identical semantics is used. numba is an optional accelerator and is not a
+hard dependency of the backend.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _score_records_numpy(norm_vecs, q, times, now, tau):
+    """Similarity + decay for all records (NumPy fallback).
+
+    Args:
+        norm_vecs: (N, D) L2-normalized state vectors
+        q: (D,) query vector (not normalized)
+        times: (N,) record timestamps in simulation seconds
+        now: current simulation time
+        tau: memory decay time constant
+
+    Returns:
+        (sims, decays) as (N,) float arrays
+    """
+    sims = (norm_vecs @ q) / (np.linalg.norm(q) + 1e-9)
+    ages = np.minimum(times - now, 0.0)
+    decays = np.exp(ages / tau)
+    return sims, decays
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _score_records_numba(norm_vecs, q, times, now, tau):  # pragma: no cover
+        n, d = norm_vecs.shape
+        sims = np.empty(n)
+        decays = np.empty(n)
+
+        q_norm = 0.0
+        for j in range(d):
+            q_norm += q[j] * q[j]
+        q_norm = q_norm ** 0.5 + 1e-9
+
+        for i in prange(n):
+            dot = 0.0
+            for j in range(d):
+                dot += norm_vecs[i, j] * q[j]
+            sims[i] = dot / q_norm
+
+            age = times[i] - now
+            if age > 0.0:
+                age = 0.0
+            decays[i] = np.exp(age / tau)
+
+        return sims, decays
+
+    score_records = _score_records_numba
+else:
+    score_records = _score_records_numpy
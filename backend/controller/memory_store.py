@@ -4,7 +4,14 @@ import time
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 
-from .state_models import MemoryRecord, Road, RoadMetricsSet, RoadMetrics
+import numpy as np
+import orjson
+
+from .state_models import MemoryRecord, Road, RoadMetricsSet, RoadMetrics, ROAD_ORDER
+from ._memory_kernels import score_records
+
+# Fixed road ordering shared by the SoA arrays below (row layout of _vec_matrix)
+_ROADS: Tuple[Road, ...] = tuple(road for road, _ in ROAD_ORDER)
 
 class MemoryStore:
     """
@@ -26,32 +33,139 @@ class MemoryStore:
         self.path = Path(file_path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
         if not self.path.exists():
-            self.path.write_text("[]", encoding="utf-8")
+            self.path.touch()
         self._cache: List[MemoryRecord] = []
+        # SoA mirrors of _cache for vectorized similarity search:
+        # one row of _vec_matrix per record (queue value per road, _ROADS order).
+        # Backing arrays are over-allocated and doubled when full, so inserts
+        # are amortized O(1); _n rows are live, the rest is spare capacity.
+        self._n: int = 0
+        # Narrow dtypes: queue values are small ints (exact in float32) and
+        # rewards never need double precision, so the scan touches half the
+        # bytes; action indices fit comfortably in int8.
+        self._vec_matrix: np.ndarray = np.empty((0, len(_ROADS)), dtype=np.float32)
+        self._times: np.ndarray = np.empty(0, dtype=np.float64)
+        self._rewards: np.ndarray = np.empty(0, dtype=np.float32)
+        self._action_idx: np.ndarray = np.empty(0, dtype=np.int8)
+        # Running per-road reward aggregates (count, sum) so summary() never
+        # has to rescan the cache
+        self._reward_count: np.ndarray = np.zeros(len(_ROADS), dtype=np.int64)
+        self._reward_sum: np.ndarray = np.zeros(len(_ROADS), dtype=np.float64)
+        # Lazily rebuilt L2-normalized copy of _vec_matrix for similarity queries
+        self._norm_matrix: Optional[np.ndarray] = None
+        self._norms_dirty: bool = True
         self._load()
+        # Append-only log handle: add_record writes one JSONL line instead of
+        # rewriting the whole file (O(1) per insert instead of O(N))
+        self._fh = open(self.path, "ab", buffering=1 << 16)
         self._start_time = time.time()  # For decay calculation
 
     def _load(self):
         try:
-            raw = json.loads(self.path.read_text(encoding="utf-8"))
-            self._cache = [MemoryRecord(**item) for item in raw]
+            raw = self.path.read_text(encoding="utf-8")
+            if raw.lstrip().startswith("["):
+                # Legacy format: single JSON array written by the old
+                # full-rewrite store. Migrate it to JSONL before the append
+                # handle opens — appending lines after the closing bracket
+                # would make the file unparseable on the next startup.
+                self._cache = [MemoryRecord(**item) for item in json.loads(raw)]
+                self._migrate_legacy_file()
+            else:
+                self._cache = [
+                    MemoryRecord(**orjson.loads(line))
+                    for line in raw.splitlines()
+                    if line.strip()
+                ]
         except Exception:
             self._cache = []
+        self._rebuild_arrays()
+
+    def _migrate_legacy_file(self):
+        """Rewrite a legacy JSON-array file as JSONL, atomically."""
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "wb") as fh:
+            for rec in self._cache:
+                fh.write(orjson.dumps(rec.dict(), option=orjson.OPT_NON_STR_KEYS) + b"\n")
+        tmp.replace(self.path)
 
-    def _save(self):
-        data = [r.dict() for r in self._cache]
-        self.path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    def _rebuild_arrays(self):
+        """Rebuild the SoA arrays from _cache (after a bulk load)."""
+        n = len(self._cache)
+        capacity = max(64, n)
+        self._n = n
+        self._vec_matrix = np.empty((capacity, len(_ROADS)), dtype=np.float32)
+        self._times = np.empty(capacity, dtype=np.float64)
+        self._rewards = np.empty(capacity, dtype=np.float32)
+        self._action_idx = np.empty(capacity, dtype=np.int8)
+        for i, rec in enumerate(self._cache):
+            self._vec_matrix[i] = [rec.state_queues.get(r, 0) for r in _ROADS]
+            self._times[i] = rec.time
+            self._rewards[i] = rec.reward
+            self._action_idx[i] = _ROADS.index(rec.action_road)
+        live_idx = self._action_idx[:n]
+        self._reward_count = np.bincount(live_idx, minlength=len(_ROADS))
+        # bincount returns int64 when weights are empty, so force float64
+        self._reward_sum = np.bincount(
+            live_idx, weights=self._rewards[:n], minlength=len(_ROADS)
+        ).astype(np.float64)
+        self._norms_dirty = True
+
+    def _grow_if_full(self):
+        """Double the backing arrays when every row is live."""
+        if self._n < len(self._times):
+            return
+        capacity = max(64, self._n * 2)
+        for name in ("_vec_matrix", "_times", "_rewards", "_action_idx"):
+            old = getattr(self, name)
+            shape = (capacity,) + old.shape[1:]
+            grown = np.empty(shape, dtype=old.dtype)
+            grown[: self._n] = old[: self._n]
+            setattr(self, name, grown)
+
+    def _rebuild_norms(self):
+        """Recompute the normalized row cache if records were added since last query."""
+        if self._norms_dirty:
+            live = self._vec_matrix[: self._n]
+            norms = np.linalg.norm(live, axis=1, keepdims=True)
+            self._norm_matrix = live / (norms + 1e-9)
+            self._norms_dirty = False
+
+    def close(self):
+        """Flush and close the append-only log handle."""
+        try:
+            self._fh.flush()
+            self._fh.close()
+        except Exception:
+            pass
 
     def add_record(self, record: MemoryRecord):
         self._cache.append(record)
-        self._save()
+        self._grow_if_full()
+        i = self._n
+        self._vec_matrix[i] = [record.state_queues.get(r, 0) for r in _ROADS]
+        self._times[i] = record.time
+        self._rewards[i] = record.reward
+        road_idx = _ROADS.index(record.action_road)
+        self._action_idx[i] = road_idx
+        self._reward_count[road_idx] += 1
+        self._reward_sum[road_idx] += record.reward
+        self._n = i + 1
+        self._norms_dirty = True
+        # Buffered append; the 64 KiB log buffer batches writes and close()
+        # flushes on shutdown, so the hot path never blocks on disk
+        self._fh.write(orjson.dumps(record.dict(), option=orjson.OPT_NON_STR_KEYS) + b"\n")
+
+    def __len__(self) -> int:
+        """Number of stored records; callers can gate similarity scans on this."""
+        return self._n
 
     def summary(self) -> Dict:
+        # O(1): read the running aggregates instead of rescanning the cache
         count = len(self._cache)
-        by_road: Dict[Road, List[float]] = {Road.north: [], Road.east: [], Road.south: [], Road.west: []}
-        for r in self._cache:
-            by_road[r.action_road].append(r.reward)
-        avg_rewards = {road.value: (sum(vals) / len(vals) if vals else 0.0) for road, vals in by_road.items()}
+        avg_rewards = {
+            name: (float(self._reward_sum[i] / self._reward_count[i]) if self._reward_count[i] else 0.0)
+            for i, (road, name) in enumerate(ROAD_ORDER)
+        }
         best_road = max(avg_rewards.items(), key=lambda kv: kv[1])[0] if avg_rewards else None
         return {
             "records": count,
@@ -67,8 +181,8 @@ class MemoryStore:
                   time_since_last_green, arrival_rate, departure_rate]
         """
         vectors = {}
-        for road in [Road.north, Road.east, Road.south, Road.west]:
-            m = getattr(metrics, road.value)
+        for road, name in ROAD_ORDER:
+            m = getattr(metrics, name)
             vec = [
                 m.waiting_count,
                 m.avg_wait_time,
@@ -132,41 +246,30 @@ class MemoryStore:
         
         if not self._cache:
             return []
-        
-        # Convert current state to vectors
-        current_vecs = self._state_to_vector(current_metrics)
-        
-        # Score all cached records by similarity
-        similarities: List[Tuple[float, MemoryRecord, float]] = []
-        
-        for rec in self._cache:
-            # We don't have full metrics stored in old records, so compute from queue proxy
-            # For now, we'll use a simplified approach: compare avg metrics across the state
-            # This is a placeholder - ideal approach stores metrics with each record
-            
-            # Compute decay weight
-            decay = self._decay_factor(rec.time, current_time)
-            
-            # Simplified similarity: sum of queue similarity
-            # (In production, would compare full metric vectors)
-            total_similarity = 0.0
-            count = 0
-            for road in [Road.north, Road.east, Road.south, Road.west]:
-                # Simple L2 distance on queue values (inverse)
-                # Queue values are single int, not vector
-                q_current = 0  # Placeholder - would get from current_metrics
-                q_past = rec.state_queues.get(road, 0)
-                dist = abs(q_current - q_past)
-                sim = 1.0 / (1.0 + dist)  # Convert distance to similarity
-                total_similarity += sim
-                count += 1
-            
-            avg_similarity = total_similarity / max(1, count)
-            similarities.append((avg_similarity, rec, decay))
-        
-        # Sort by similarity (descending) and return top-K
-        similarities.sort(key=lambda x: x[0] * x[2], reverse=True)
-        return similarities[:k]
+
+        # Old records only store queue values, so the query vector is the
+        # current waiting count per road (queue proxy for the stored state).
+        q = np.array(
+            [getattr(current_metrics, r.value).waiting_count for r in _ROADS],
+            dtype=np.float64,
+        )
+
+        # Cosine similarity and decay for all cached rows in one fused kernel
+        # (Numba-compiled when available, NumPy otherwise), using the cached
+        # normalized rows (rebuilt only after add_record)
+        self._rebuild_norms()
+        sims, decays = score_records(
+            self._norm_matrix, q, self._times[: self._n],
+            float(current_time), float(self.MEMORY_DECAY_TAU),
+        )
+
+        # O(N) top-K selection on decay-weighted similarity, then sort only
+        # the K survivors; only those are materialized into tuples.
+        scores = sims * decays
+        k = min(k, len(self._cache))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(sims[i]), self._cache[i], float(decays[i])) for i in top]
     
     def get_weighted_rewards_by_road(
         self,
@@ -182,13 +285,15 @@ class MemoryStore:
         """
         if k is None:
             k = self.TOP_K
-        
+
+        # Cold-start fast path: with no records a scan cannot match anything
+        if not self._n:
+            return {road: (0.0, 0) for road in _ROADS}
+
         similar = self.find_similar_states(current_metrics, current_time, k)
         
-        reward_by_road: Dict[Road, List[float]] = {
-            Road.north: [], Road.east: [], Road.south: [], Road.west: []
-        }
-        
+        reward_by_road: Dict[Road, List[float]] = {road: [] for road in _ROADS}
+
         for sim_score, rec, decay in similar:
             # Apply both similarity score and decay as weights
             weight = sim_score * decay
@@ -210,7 +315,7 @@ class MemoryStore:
     @staticmethod
     def _distance(a: Dict[Road, int], b: Dict[Road, int]) -> float:
         # Euclidean distance over queue vectors (kept for backward compatibility)
-        return math.sqrt(sum((a[r] - b[r]) ** 2 for r in [Road.north, Road.east, Road.south, Road.west]))
+        return math.sqrt(sum((a[r] - b[r]) ** 2 for r in _ROADS))
 
     def find_best_action(self, state_queues: Dict[Road, int]) -> Tuple[Road, int, str]:
         """Return (road, duration, reason) based on nearest past states with best reward."""
@@ -219,23 +324,23 @@ class MemoryStore:
             road = max(state_queues.items(), key=lambda kv: kv[1])[0]
             return road, 20, "default: highest queue"
 
-        # Find k nearest states (k=10)
-        items: List[Tuple[float, MemoryRecord]] = []
-        for rec in self._cache:
-            d = self._distance(state_queues, rec.state_queues)
-            items.append((d, rec))
-        items.sort(key=lambda x: x[0])
-        k = 10
-        nearest = items[:k]
-
-        # Aggregate rewards per action road
-        reward_by_road: Dict[Road, List[float]] = {Road.north: [], Road.east: [], Road.south: [], Road.west: []}
-        for _, rec in nearest:
-            reward_by_road[rec.action_road].append(rec.reward)
-
-        # Choose road with best average reward; break ties by current max queue
-        avg = {road: (sum(vals)/len(vals) if vals else -1e9) for road, vals in reward_by_road.items()}
-        best_road = max(avg.items(), key=lambda kv: kv[1])[0]
+        # Find k nearest states (k=10) against the SoA queue matrix in one
+        # pass; squared distances rank identically, so skip the sqrt
+        q_arr = np.array([state_queues.get(r, 0) for r in _ROADS], dtype=np.float64)
+        diffs = self._vec_matrix[: self._n] - q_arr
+        d2 = (diffs * diffs).sum(axis=1)
+        k = min(10, len(self._cache))
+        idx = np.argpartition(d2, k - 1)[:k]
+
+        # Per-road average reward over the neighbours via bincount instead of
+        # materializing the records; roads with no match score -1e9
+        sel = self._action_idx[idx]
+        counts = np.bincount(sel, minlength=len(_ROADS))
+        sums = np.bincount(
+            sel, weights=self._rewards[idx], minlength=len(_ROADS)
+        ).astype(np.float64)
+        avg = np.where(counts > 0, sums / np.maximum(counts, 1), -1e9)
+        best_road = _ROADS[int(np.argmax(avg))]
 
         # Duration heuristic: weighted by current queue but bounded
         q = state_queues[best_road]
@@ -5,6 +5,8 @@ import time
 from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional, Any
 
+import numpy as np
+
 try:
     import torch
     import torch.nn as nn
@@ -29,6 +31,10 @@ DEFAULT_VEHICLE_WEIGHTS = {
     "lorry": 4.0,
 }
 
+# Fixed vehicle-type order for the precomputed weight pairs/vector; the obs
+# approach dicts built by the controller always carry exactly these keys
+VEHICLE_TYPE_ORDER = ("bike", "car", "auto", "bus", "truck", "lorry")
+
 
 def clamp(x: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, x))
@@ -231,6 +237,14 @@ class MultiAgentManager:
         self.normalize_queue_by = max(1.0, float(normalize_queue_by))
         self.device = device
 
+        # (type, weight) pairs in fixed order so weighted_queue is a single
+        # pass with a bound dict.get, instead of a weight lookup per type
+        self._weight_pairs: Tuple[Tuple[str, float], ...] = tuple(
+            (t, float(self.weights.get(t, 1.0))) for t in VEHICLE_TYPE_ORDER
+        )
+        # Same weights as a vector for the batched per-approach matvec
+        self._weight_vec = np.array([w for _, w in self._weight_pairs], dtype=np.float64)
+
         self.agents: Dict[str, DQNAgent] = {}
 
         # for transitions
@@ -260,22 +274,33 @@ class MultiAgentManager:
 
     # ---- priority weighted queue ----
     def weighted_queue(self, counts_by_type: Dict[str, int]) -> float:
-        total = 0.0
-        for vtype, cnt in counts_by_type.items():
-            total += float(cnt) * float(self.weights.get(vtype, 1.0))
-        return total
+        get = counts_by_type.get
+        return float(sum(w * get(t, 0) for t, w in self._weight_pairs))
+
+    def _approach_queues(self, obs: Dict[str, Any], approach_keys: List[str]) -> np.ndarray:
+        """Weighted queues for all approaches at once: one (A, types) matrix
+        times the cached weight vector instead of a Python loop per approach."""
+        # Controllers that prebuild the counts matrix (VEHICLE_TYPE_ORDER
+        # columns, approach-key rows) let us skip the dict gathering entirely
+        mat = obs.get("counts_matrix")
+        if mat is None or len(mat) != len(approach_keys):
+            approaches = obs.get("approaches", {})
+            mat = np.array(
+                [
+                    [by_type.get(t, 0) for t, _ in self._weight_pairs]
+                    for by_type in (approaches.get(k, {}) for k in approach_keys)
+                ],
+                dtype=np.float64,
+            )
+        return mat @ self._weight_vec
 
     # ---- build state ----
     def build_state(self, junc_id: str, obs: Dict[str, Any]) -> List[float]:
         jc = self.cfg[junc_id]
         approach_keys: List[str] = jc["approach_keys"]
 
-        # weighted queues normalized
-        queues = []
-        for k in approach_keys:
-            by_type = obs.get("approaches", {}).get(k, {})
-            q = self.weighted_queue(by_type)
-            queues.append(q / self.normalize_queue_by)
+        # weighted queues normalized (all approaches in one matvec)
+        queues = (self._approach_queues(obs, approach_keys) / self.normalize_queue_by).tolist()
 
         # current green one-hot
         g_len = jc["green_onehot_len"]
@@ -300,24 +325,16 @@ class MultiAgentManager:
         jc = self.cfg[junc_id]
         approach_keys = jc["approach_keys"]
 
-        def qvec(o: Dict[str, Any]) -> List[float]:
-            out = []
-            for k in approach_keys:
-                out.append(self.weighted_queue(o.get("approaches", {}).get(k, {})))
-            return out
-
-        before = qvec(prev_obs)
-        after = qvec(new_obs)
+        before = self._approach_queues(prev_obs, approach_keys)
+        after = self._approach_queues(new_obs, approach_keys)
 
-        acted = int(clamp(int(action_idx), 0, len(before) - 1))
+        acted = int(clamp(int(action_idx), 0, before.size - 1))
 
-        acted_reduction = before[acted] - after[acted]
-        inc = []
-        for i in range(len(before)):
-            if i == acted:
-                continue
-            inc.append(max(0.0, after[i] - before[i]))
-        avg_inc_other = (sum(inc) / len(inc)) if inc else 0.0
+        acted_reduction = float(before[acted] - after[acted])
+        # Clamped queue growth on the non-acted approaches, vectorized
+        inc = np.maximum(after - before, 0.0)
+        inc[acted] = 0.0
+        avg_inc_other = float(inc.sum() / (before.size - 1)) if before.size > 1 else 0.0
 
         return float(acted_reduction - 0.5 * avg_inc_other)
 
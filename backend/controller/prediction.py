@@ -9,203 +9,144 @@ Provides lightweight, explainable predictions without ML:
 - Predicted ETA to clear queue
 """
 
-import math
 from typing import Dict, Optional
-from collections import deque
-from datetime import datetime
 
-from .state_models import Road, RoadMetricsSet, RoadMetrics
+import numpy as np
+
+from .state_models import Road, RoadMetricsSet, RoadMetrics, ROAD_ORDER, ROAD_GETTERS
+from ._prediction_kernels import predict_roads
+
+# Number of roads; column count of the history ring buffer
+_N_ROADS = len(ROAD_ORDER)
+
+# Label tuples indexed by the integer codes the vectorized kernels produce.
+# Keeping the codes numeric until the final mapping means the whole numeric
+# pipeline stays Numba-compatible (kernels never touch Python strings).
+_TREND_LABELS = ("increasing", "stable", "decreasing")   # 0/1/2
+_LEVEL_LABELS = ("LOW", "MEDIUM", "HIGH")                # 0/1/2
 
 
 class TrafficPredictor:
     """
     Computes traffic predictions for decision biasing.
-    
+
     Maintains per-road queue history and computes:
     - Queue trends (increasing/stable/decreasing)
     - Arrival forecasts
     - Heavy traffic probability
     - Congestion classification
     - Predicted clearance time
+
+    All numeric work in predict() runs as elementwise NumPy ops over
+    length-5 vectors (one lane per road) instead of per-road Python loops.
     """
-    
+
     # === Configuration ===
     QUEUE_HISTORY_SIZE = 30  # Seconds of history to maintain
     TREND_THRESHOLD = 0.5    # vehicles/second threshold for trend classification
-    
+
     # Heavy traffic probability weights
     HEAVY_WEIGHT_CONGESTION = 0.5  # Congestion impact (0-100%)
     HEAVY_WEIGHT_TREND = 0.3       # Trend impact (0-100%)
     HEAVY_WEIGHT_FLOW = 0.2        # Net flow impact (0-100%)
-    
+
     # Congestion level thresholds
     CONGESTION_THRESHOLD_LOW = 30    # 0-30% = LOW
     CONGESTION_THRESHOLD_MEDIUM = 60  # 30-60% = MEDIUM, 60-100% = HIGH
-    
+
+    # Normalization ranges for the heavy-traffic heuristic
+    MAX_TREND = 5.0       # Assumed trend range: -5..+5 vehicles/sec
+    MAX_FLOW_DIFF = 30.0  # Assumed net-flow range: -30..+30 vpm
+
+    # Folded normalization scales: (x + MAX) / (2 * MAX) * 100 == (x + MAX) * SCALE
+    TREND_NORM_SCALE = 100.0 / (2 * MAX_TREND)
+    FLOW_NORM_SCALE = 100.0 / (2 * MAX_FLOW_DIFF)
+
     def __init__(self):
         """Initialize predictor with empty queue history."""
-        self.queue_history: Dict[Road, deque] = {
-            road: deque(maxlen=self.QUEUE_HISTORY_SIZE)
-            for road in Road
+        # Queue history for all roads in one fixed-size ring buffer: row per
+        # second, column per road. O(1) append via the write cursor, and the
+        # trend math reads whole rows instead of per-road deques.
+        self._hist = np.zeros((self.QUEUE_HISTORY_SIZE, _N_ROADS), dtype=np.int32)
+        self._cursor = 0
+        self._filled = 0
+        # Reusable output containers: predict() mutates these in place each
+        # tick instead of allocating a fresh dict-of-dicts
+        self._pred_out: Dict[Road, Dict] = {
+            road: {
+                "queue_trend": "stable",
+                "arrivals_10s": 0.0,
+                "arrivals_30s": 0.0,
+                "heavy_traffic_probability": 0.0,
+                "congestion_level": "LOW",
+                "predicted_eta_clear_seconds": 0.0,
+            }
+            for road, _ in ROAD_ORDER
         }
-        self._start_time = datetime.now()
-    
+
     def reset(self):
         """Reset all history."""
-        for road in Road:
-            self.queue_history[road].clear()
-    
+        self._cursor = 0
+        self._filled = 0
+
+    @staticmethod
+    def _gather(metrics: RoadMetricsSet) -> np.ndarray:
+        """
+        Read every field the predictor needs in one pass over the roads.
+
+        Returns a (roads, 6) float64 array with columns
+        [waiting, arrival, departure, congestion, eta, time_since_green],
+        so the rest of predict() works on column views instead of repeated
+        attribute access per helper.
+        """
+        return np.array(
+            [
+                [
+                    m.waiting_count,
+                    m.arrival_rate_vpm,
+                    m.departure_rate_vpm,
+                    m.congestion_percent,
+                    m.eta_clear_seconds,
+                    m.time_since_last_green,
+                ]
+                for m in (get(metrics) for get in ROAD_GETTERS)
+            ],
+            dtype=np.float64,
+        )
+
+    def _push_history(self, waiting_row: np.ndarray):
+        """Append one row of waiting counts to the ring buffer."""
+        self._hist[self._cursor] = waiting_row
+        self._cursor = (self._cursor + 1) % self.QUEUE_HISTORY_SIZE
+        self._filled = min(self._filled + 1, self.QUEUE_HISTORY_SIZE)
+
     def update_queue_history(self, current_metrics: RoadMetricsSet):
         """
         Update queue history with current waiting vehicle counts.
         Called once per simulation step.
         """
-        for road in Road:
-            m = getattr(current_metrics, road.value)
-            self.queue_history[road].append(m.waiting_count)
-    
-    def _compute_trend(self, road: Road) -> tuple:
-        """
-        Compute queue trend for a road.
-        
-        Returns:
-            (trend_value, trend_classification)
-            trend_classification in ["increasing", "stable", "decreasing"]
-        """
-        history = self.queue_history[road]
-        
-        # Need at least 2 points to compute trend
-        if len(history) < 2:
-            return 0.0, "stable"
-        
-        # Compute trend as (current - oldest) / time_span
-        queue_now = history[-1]  # Most recent
-        queue_old = history[0]   # Oldest
-        time_span = len(history) - 1  # Seconds
-        
-        if time_span == 0:
-            return 0.0, "stable"
-        
-        trend = (queue_now - queue_old) / time_span
-        
-        # Classify trend
-        if trend > self.TREND_THRESHOLD:
-            classification = "increasing"
-        elif trend < -self.TREND_THRESHOLD:
-            classification = "decreasing"
-        else:
-            classification = "stable"
-        
-        return trend, classification
-    
-    def _predict_arrivals(self, metrics: RoadMetricsSet, road: Road) -> tuple:
-        """
-        Predict arrivals for next 10s and 30s.
-        
-        arrivals = arrival_rate_vpm / X where X converts rate to timeframe.
-        
-        Returns:
-            (arrivals_10s, arrivals_30s)
-        """
-        m = getattr(metrics, road.value)
-        arrival_rate_vpm = m.arrival_rate_vpm
-        
-        # Convert rate from vehicles per minute to vehicles per second
-        # then multiply by time period in seconds
-        arrivals_10s = (arrival_rate_vpm / 60.0) * 10.0
-        arrivals_30s = (arrival_rate_vpm / 60.0) * 30.0
-        
-        return arrivals_10s, arrivals_30s
-    
-    def _compute_heavy_traffic_probability(
-        self,
-        metrics: RoadMetricsSet,
-        road: Road,
-        trend: float
-    ) -> float:
-        """
-        Compute heavy traffic probability using heuristic score.
-        
-        heavy_score = 
-            0.5 * congestion_percent
-          + 0.3 * normalized_trend
-          + 0.2 * net_flow
-        
-        Returns probability 0-100%.
-        """
-        m = getattr(metrics, road.value)
-        
-        # Factor 1: Current congestion (already 0-100%)
-        congestion_factor = m.congestion_percent
-        
-        # Factor 2: Queue trend impact
-        # Normalize trend to 0-100 range
-        # Assume trend ranges from -5 to +5 vehicles/sec
-        # Positive trend = increasing queues = higher heavy probability
-        max_trend = 5.0
-        trend_normalized = max(0, min(100, (trend + max_trend) / (2 * max_trend) * 100))
-        
-        # Factor 3: Net flow (arrival - departure rate)
-        # Positive net flow = more arriving than departing = building queue
-        net_flow_rate = m.arrival_rate_vpm - m.departure_rate_vpm
-        # Normalize assuming max difference of ±30 vpm
-        max_flow_diff = 30.0
-        flow_normalized = max(0, min(100, (net_flow_rate + max_flow_diff) / (2 * max_flow_diff) * 100))
-        
-        # Weighted combination
-        heavy_score = (
-            self.HEAVY_WEIGHT_CONGESTION * congestion_factor
-            + self.HEAVY_WEIGHT_TREND * trend_normalized
-            + self.HEAVY_WEIGHT_FLOW * flow_normalized
-        )
-        
-        # Clamp to 0-100
-        return max(0.0, min(100.0, heavy_score))
-    
-    def _classify_congestion_level(self, probability: float) -> str:
-        """
-        Classify congestion level based on heavy traffic probability.
-        
-        0-30%   → "LOW"
-        30-60%  → "MEDIUM"
-        60-100% → "HIGH"
-        """
-        if probability < self.CONGESTION_THRESHOLD_LOW:
-            return "LOW"
-        elif probability < self.CONGESTION_THRESHOLD_MEDIUM:
-            return "MEDIUM"
-        else:
-            return "HIGH"
-    
-    def _predict_eta_clear(
-        self,
-        metrics: RoadMetricsSet,
-        road: Road,
-        trend: float,
-        heavy_probability: float
-    ) -> float:
+        self._push_history(self._gather(current_metrics)[:, 0])
+
+    def _compute_trends(self) -> np.ndarray:
         """
-        Predict ETA to clear queue.
-        
-        If queue is increasing, multiply base ETA by (1 + heavy_probability/100).
-        Otherwise, return base ETA.
+        Compute the queue trend (vehicles/second) for every road at once.
+
+        Trend = (newest - oldest) / time_span over the ring buffer window;
+        zeros until at least two samples exist.
         """
-        m = getattr(metrics, road.value)
-        base_eta = m.eta_clear_seconds
-        
-        # Apply adjustment only if queue is increasing
-        if trend > self.TREND_THRESHOLD:
-            # Increasing queue: add predicted delay
-            adjusted_eta = base_eta * (1.0 + heavy_probability / 100.0)
-            return min(adjusted_eta, 300.0)  # Cap at 5 minutes
-        else:
-            # Decreasing or stable: return base ETA
-            return base_eta
-    
+        if self._filled < 2:
+            return np.zeros(_N_ROADS, dtype=np.float64)
+
+        # Newest row is just behind the cursor; oldest is at the cursor once
+        # the ring has wrapped, else at row 0.
+        newest = self._hist[(self._cursor - 1) % self.QUEUE_HISTORY_SIZE]
+        oldest = self._hist[self._cursor if self._filled == self.QUEUE_HISTORY_SIZE else 0]
+        return (newest - oldest) / float(self._filled - 1)
+
     def predict(self, current_metrics: RoadMetricsSet) -> Dict[Road, Dict]:
         """
         Compute all predictions for all roads.
-        
+
         Returns:
             Dict mapping Road -> {
                 "queue_trend": str,
@@ -216,30 +157,52 @@ class TrafficPredictor:
                 "predicted_eta_clear_seconds": float
             }
         """
-        # Update history with current metrics
-        self.update_queue_history(current_metrics)
-        
-        predictions = {}
-        
-        for road in Road:
-            # Compute all prediction components
-            trend, trend_class = self._compute_trend(road)
-            arrivals_10s, arrivals_30s = self._predict_arrivals(current_metrics, road)
-            heavy_prob = self._compute_heavy_traffic_probability(current_metrics, road, trend)
-            congestion_level = self._classify_congestion_level(heavy_prob)
-            predicted_eta = self._predict_eta_clear(current_metrics, road, trend, heavy_prob)
-            
-            predictions[road] = {
-                "queue_trend": trend_class,
-                "arrivals_10s": round(arrivals_10s, 2),
-                "arrivals_30s": round(arrivals_30s, 2),
-                "heavy_traffic_probability": round(heavy_prob, 1),
-                "congestion_level": congestion_level,
-                "predicted_eta_clear_seconds": round(predicted_eta, 2),
-            }
-        
-        return predictions
-    
+        # One pass over the metrics models, then column views for the math
+        gathered = self._gather(current_metrics)
+        self._push_history(gathered[:, 0])
+        arrival = gathered[:, 1]
+        departure = gathered[:, 2]
+        congestion = gathered[:, 3]
+        base_eta = gathered[:, 4]
+
+        # One vector subtract over the ring buffer yields all trends at once;
+        # classification is two elementwise compares mapped through the
+        # labels tuple instead of chained Python conditionals per road
+        trend = self._compute_trends()
+        trend_codes = np.where(
+            trend > self.TREND_THRESHOLD, 0,
+            np.where(trend < -self.TREND_THRESHOLD, 2, 1),
+        )
+        trend_classes = [_TREND_LABELS[c] for c in trend_codes]
+
+        # Arrival forecasts, heavy-traffic probability, congestion level and
+        # adjusted ETA, all in one fused kernel (Numba-compiled when
+        # available, NumPy otherwise)
+        arrivals_10s, arrivals_30s, heavy_prob, level_idx, eta_out = predict_roads(
+            arrival, departure, congestion, base_eta, trend,
+            self.HEAVY_WEIGHT_CONGESTION, self.HEAVY_WEIGHT_TREND,
+            self.HEAVY_WEIGHT_FLOW, self.TREND_THRESHOLD,
+            self.MAX_TREND, self.TREND_NORM_SCALE,
+            self.MAX_FLOW_DIFF, self.FLOW_NORM_SCALE,
+            float(self.CONGESTION_THRESHOLD_LOW), float(self.CONGESTION_THRESHOLD_MEDIUM),
+        )
+
+        # Round the vectors once, then refill the reusable per-road dicts.
+        # The returned mapping is valid until the next predict() call.
+        arrivals_10s = np.round(arrivals_10s, 2)
+        arrivals_30s = np.round(arrivals_30s, 2)
+        heavy_prob = np.round(heavy_prob, 1)
+        eta_out = np.round(eta_out, 2)
+        for i, (road, _) in enumerate(ROAD_ORDER):
+            out = self._pred_out[road]
+            out["queue_trend"] = trend_classes[i]
+            out["arrivals_10s"] = float(arrivals_10s[i])
+            out["arrivals_30s"] = float(arrivals_30s[i])
+            out["heavy_traffic_probability"] = float(heavy_prob[i])
+            out["congestion_level"] = _LEVEL_LABELS[level_idx[i]]
+            out["predicted_eta_clear_seconds"] = float(eta_out[i])
+        return self._pred_out
+
     def get_prediction_bias_for_road(
         self,
         road: Road,
@@ -248,13 +211,14 @@ class TrafficPredictor:
     ) -> float:
         """
         Compute prediction bias for decision scoring.
-        
+
         Bias = weight * heavy_traffic_probability
-        
+
         This encourages the controller to serve roads with predicted heavy traffic.
         """
-        if road not in predictions:
+        # Zero weight means zero bias regardless of the prediction
+        if weight == 0.0 or road not in predictions:
             return 0.0
-        
+
         heavy_prob = predictions[road].get("heavy_traffic_probability", 0.0)
         return weight * heavy_prob
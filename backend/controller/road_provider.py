@@ -7,6 +7,7 @@ Supports:
 - HybridProvider: combines fake (N/E/S) + YOLO camera (WEST)
 """
 
+import dataclasses
 import logging
 from abc import ABC, abstractmethod
 from typing import Dict, Optional
@@ -69,7 +70,7 @@ class FakeProvider(RoadProviderBase):
         from controller.state_models import Road
         counts_obj = self.fake_gen.next_counts()
         return {
-            road.value: getattr(counts_obj, road.value).dict()
+            road.value: dataclasses.asdict(getattr(counts_obj, road.value))
             for road in Road
         }
     
@@ -142,7 +143,7 @@ class SumoProvider(RoadProviderBase):
         counts_obj = self.sumo.get_counts()
         from controller.state_models import Road
         return {
-            road.value: getattr(counts_obj, road.value).dict()
+            road.value: dataclasses.asdict(getattr(counts_obj, road.value))
             for road in Road
         }
     
@@ -1,4 +1,6 @@
+from dataclasses import dataclass, field
 from enum import Enum
+from operator import attrgetter
 from typing import Dict, Optional, List
 from pydantic import BaseModel
 
@@ -9,6 +11,15 @@ class Road(str, Enum):
     j8_east_entry = "j8_east_entry"
     j8_south_entry = "j8_south_entry"
 
+
+# Canonical (member, name) iteration order for the roads. Hot loops use this
+# instead of iterating the enum and touching road.value per element.
+ROAD_ORDER = tuple((road, road.value) for road in Road)
+
+# Cached attrgetters in the same order, so pulling a road's field off a
+# per-road model is one C-level call instead of getattr(obj, road.value)
+ROAD_GETTERS = tuple(attrgetter(name) for _, name in ROAD_ORDER)
+
 class VehicleType(str, Enum):
     car = "car"
     bike = "bike"
@@ -17,7 +28,14 @@ class VehicleType(str, Enum):
     lorry = "lorry"
     auto = "auto"
 
-class RoadVehicleCounts(BaseModel):
+@dataclass(slots=True)
+class RoadVehicleCounts:
+    """Per-road vehicle counts by type.
+
+    Plain dataclass for the same reason as RoadMetrics: one instance per
+    road is rebuilt every simulation step, so validation is deferred to the
+    StatusResponse boundary.
+    """
     car: int = 0
     bike: int = 0
     bus: int = 0
@@ -25,27 +43,37 @@ class RoadVehicleCounts(BaseModel):
     lorry: int = 0
     auto: int = 0
 
-class TrafficCounts(BaseModel):
+@dataclass(slots=True)
+class TrafficCounts:
     west_entry: RoadVehicleCounts
     j1_north_entry: RoadVehicleCounts
     j8_north_entry: RoadVehicleCounts
     j8_east_entry: RoadVehicleCounts
     j8_south_entry: RoadVehicleCounts
 
-class SignalState(BaseModel):
+@dataclass(slots=True)
+class SignalState:
     greenRoad: Road
     remaining: int
 
-class EmergencyInfo(BaseModel):
+@dataclass(slots=True)
+class EmergencyInfo:
     active: bool
     road: Optional[Road]
 
-class DecisionInfo(BaseModel):
+@dataclass(slots=True)
+class DecisionInfo:
     method: str
     reason: str
 
-class RoadMetrics(BaseModel):
-    """Per-road metrics for traffic analysis"""
+@dataclass(slots=True)
+class RoadMetrics:
+    """Per-road metrics for traffic analysis.
+
+    Plain dataclass (not BaseModel): these are rebuilt every simulation step,
+    so we skip Pydantic validation on the hot path and only validate at the
+    API boundary via StatusResponse.
+    """
     waiting_count: int = 0
     avg_wait_time: float = 0.0
     cleared_last_interval: int = 0
@@ -55,15 +83,17 @@ class RoadMetrics(BaseModel):
     congestion_percent: float = 0.0
     eta_clear_seconds: float = 0.0
 
-class RoadMetricsSet(BaseModel):
+@dataclass(slots=True)
+class RoadMetricsSet:
     """Metrics for all entry roads"""
-    west_entry: RoadMetrics = RoadMetrics()
-    j1_north_entry: RoadMetrics = RoadMetrics()
-    j8_north_entry: RoadMetrics = RoadMetrics()
-    j8_east_entry: RoadMetrics = RoadMetrics()
-    j8_south_entry: RoadMetrics = RoadMetrics()
-
-class PredictionMetrics(BaseModel):
+    west_entry: RoadMetrics = field(default_factory=RoadMetrics)
+    j1_north_entry: RoadMetrics = field(default_factory=RoadMetrics)
+    j8_north_entry: RoadMetrics = field(default_factory=RoadMetrics)
+    j8_east_entry: RoadMetrics = field(default_factory=RoadMetrics)
+    j8_south_entry: RoadMetrics = field(default_factory=RoadMetrics)
+
+@dataclass(slots=True)
+class PredictionMetrics:
     """Per-road short-term traffic predictions"""
     queue_trend: str = "stable"  # "increasing", "stable", "decreasing"
     arrivals_10s: float = 0.0    # Predicted arrivals in next 10 seconds
@@ -72,13 +102,14 @@ class PredictionMetrics(BaseModel):
     congestion_level: str = "LOW"  # "LOW", "MEDIUM", "HIGH"
     predicted_eta_clear_seconds: float = 0.0  # Estimated time to clear queue
 
-class PredictionSet(BaseModel):
+@dataclass(slots=True)
+class PredictionSet:
     """Predictions for all entry roads"""
-    west_entry: PredictionMetrics = PredictionMetrics()
-    j1_north_entry: PredictionMetrics = PredictionMetrics()
-    j8_north_entry: PredictionMetrics = PredictionMetrics()
-    j8_east_entry: PredictionMetrics = PredictionMetrics()
-    j8_south_entry: PredictionMetrics = PredictionMetrics()
+    west_entry: PredictionMetrics = field(default_factory=PredictionMetrics)
+    j1_north_entry: PredictionMetrics = field(default_factory=PredictionMetrics)
+    j8_north_entry: PredictionMetrics = field(default_factory=PredictionMetrics)
+    j8_east_entry: PredictionMetrics = field(default_factory=PredictionMetrics)
+    j8_south_entry: PredictionMetrics = field(default_factory=PredictionMetrics)
 
 class MemoryRecord(BaseModel):
     """Record of a state-action-reward experience for learning."""
@@ -95,7 +126,8 @@ class ManualCommand(BaseModel):
     duration: int
     start_time: float
 
-class ManualInfo(BaseModel):
+@dataclass(slots=True)
+class ManualInfo:
     """Manual control status"""
     active: bool
     command: Optional[str] = None
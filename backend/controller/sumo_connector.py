@@ -1,16 +1,95 @@
 import os
+import re
 import sys
 import traci
+import traci.constants as tc
+
+try:
+    # In-process SUMO binding: same API as traci, but each call is a direct
+    # C++ function call instead of a TCP round trip. Optional accelerator —
+    # no GUI support, so it is only used for headless runs.
+    import libsumo
+    LIBSUMO_AVAILABLE = True
+except ImportError:
+    libsumo = None
+    LIBSUMO_AVAILABLE = False
 from typing import Dict, Optional, List, Set, Tuple
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime
 import logging
 
+import numpy as np
+
 from .state_models import TrafficCounts, RoadVehicleCounts, EmergencyInfo, Road, RoadMetrics, RoadMetricsSet
 from .sumo_road_map import SUMO_ROADS
 
 logger = logging.getLogger(__name__)
 
+# Byte codes for TLS state characters, used by the vectorized green-mask math
+_ORD_G = ord('G')
+_ORD_g = ord('g')
+_ORD_r = ord('r')
+
+# Emergency vehicles are classified once on arrival (vehicle IDs and types are
+# stable in SUMO), so the per-step check is a dict lookup with no TraCI calls
+_EMERGENCY_RE = re.compile(r'(?i)(emergency|ambulance)')
+_EMERGENCY_TYPES = frozenset({"police", "ambulance", "firetruck"})
+
+# Vehicle-type bucket order, matching the RoadVehicleCounts field order so a
+# counts row can be unpacked positionally
+_TYPE_ORDER = ("car", "bike", "bus", "truck", "lorry", "auto")
+_TYPE_INDEX = {t: i for i, t in enumerate(_TYPE_ORDER)}
+
+
+class _VehicleTable:
+    """
+    SoA table of tracked vehicles: parallel arrays (road index, accumulated
+    wait time, active flag) plus an id->row map and a free list for reuse.
+    Per-road reductions become NumPy masked ops over contiguous memory
+    instead of walking per-road dicts.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.road = np.zeros(capacity, dtype=np.int8)
+        self.wait = np.zeros(capacity, dtype=np.float32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.id_to_row: Dict[str, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+    def add(self, veh_id: str, road_idx: int) -> int:
+        """Allocate a row for a newly seen vehicle (wait reset to zero)."""
+        if not self._free:
+            self._grow()
+        row = self._free.pop()
+        self.id_to_row[veh_id] = row
+        self.road[row] = road_idx
+        self.wait[row] = 0.0
+        self.active[row] = True
+        return row
+
+    def remove(self, veh_id: str):
+        """Release the row of a departed vehicle back to the free list."""
+        row = self.id_to_row.pop(veh_id, None)
+        if row is not None:
+            self.active[row] = False
+            self._free.append(row)
+
+    def clear(self):
+        self.active[:] = False
+        self.id_to_row.clear()
+        self._free = list(range(len(self.road) - 1, -1, -1))
+
+    def _grow(self):
+        old = len(self.road)
+        new = old * 2
+        for name in ("road", "wait", "active"):
+            arr = getattr(self, name)
+            grown = np.zeros(new, dtype=arr.dtype)
+            grown[:old] = arr
+            setattr(self, name, grown)
+        self._free.extend(range(new - 1, old - 1, -1))
+
+
 class SUMOConnector:
     """
     Connects to SUMO via TraCI to:
@@ -23,12 +102,19 @@ class SUMOConnector:
     # Configuration constants
     MAX_QUEUE_PER_ROAD = 40  # vehicles
     WAITING_SPEED_THRESHOLD = 2.0  # m/s
+    RATE_WINDOW_SEC = 60  # Rolling window for arrival/departure rates
 
     def __init__(self, sumo_cfg_path: str, use_gui: bool = True):
         self.sumo_cfg = sumo_cfg_path
         self.use_gui = use_gui
+        # Route all SUMO calls through libsumo when it is installed and no
+        # GUI is requested; otherwise fall back to the TraCI socket client.
+        self._traci = libsumo if (LIBSUMO_AVAILABLE and not use_gui) else traci
         self._t = 0
         self.connected = False
+        # Per-transition logging is gated: every TraCI phase change is on the
+        # hottest control path and the prints block on stdout flushing
+        self.debug = os.getenv("SUMO_DEBUG") == "1"
         
         # Vehicle type mapping fallback
         self.type_map = {
@@ -39,6 +125,12 @@ class SUMOConnector:
             "trailer": "lorry",
             "taxi": "auto",
         }
+        # Class->bucket index with the "car" default folded in, so the
+        # fallback path is one defaultdict lookup per vehicle
+        self._class_to_type_idx = defaultdict(
+            lambda: _TYPE_INDEX["car"],
+            {cls: _TYPE_INDEX[t] for cls, t in self.type_map.items()},
+        )
         
         # Road edge IDs (incoming edges)
         self.edge_map: Dict[Road, str] = {}
@@ -48,19 +140,70 @@ class SUMOConnector:
             self.edge_map[Road(r_id)] = r_data["entryEdge"]
             self.junction_ids.add(r_data["junctionId"])
         
-        # Metrics tracking per road
-        self.vehicle_waiting_times: Dict[Road, Dict[str, float]] = {road: {} for road in self.edge_map.keys()}
-        self.vehicle_in_edge: Dict[Road, Set[str]] = {road: set() for road in self.edge_map.keys()}
-        self.arrival_history: Dict[Road, List[int]] = {road: [] for road in self.edge_map.keys()}
-        self.departure_history: Dict[Road, List[int]] = {road: [] for road in self.edge_map.keys()}
-        self.last_green_time: Dict[Road, int] = {road: -9999 for road in self.edge_map.keys()}
-        self.cleared_last_interval: Dict[Road, int] = {road: 0 for road in self.edge_map.keys()}
+        # Hoisted iteration order and integer road indices: hot loops walk
+        # these tuples and index flat lists instead of hashing Road enums
+        # through per-road dicts on every access
+        self._road_edge_pairs: Tuple[Tuple[Road, str], ...] = tuple(self.edge_map.items())
+        self._road_idx: Dict[Road, int] = {road: i for i, (road, _) in enumerate(self._road_edge_pairs)}
+        n_roads = len(self._road_edge_pairs)
+
+        # Metrics tracking: one SoA table for all tracked vehicles plus
+        # per-road membership sets for arrival/departure diffing, all
+        # addressed by road index
+        self._vehicles = _VehicleTable()
+        # Vehicle IDs are interned to dense integers on first sight; per-road
+        # membership is a sorted int64 array so the arrival/departure diff is
+        # a C-level np.setdiff1d instead of string-hashing set differences
+        self._id2int: Dict[str, int] = {}
+        self._int2id: List[Optional[str]] = []
+        # Handles of departed vehicles, recycled by the intern loop so the
+        # tables stay bounded by concurrent (not total) vehicles seen
+        self._free_handles: List[int] = []
+        self.vehicle_in_edge: List[np.ndarray] = [
+            np.empty(0, dtype=np.int64) for _ in range(n_roads)
+        ]
+        # Arrival/departure counts per second over the rolling 60 s window,
+        # with running sums so compute_metrics never rescans the history
+        # (bounded memory; the old lists grew for the whole simulation)
+        self.arrival_history: List[deque] = [deque(maxlen=self.RATE_WINDOW_SEC) for _ in range(n_roads)]
+        self.departure_history: List[deque] = [deque(maxlen=self.RATE_WINDOW_SEC) for _ in range(n_roads)]
+        self.arrival_window_sum: List[int] = [0] * n_roads
+        self.departure_window_sum: List[int] = [0] * n_roads
+        self.last_green_time: List[int] = [-9999] * n_roads
+        self.cleared_last_interval: List[int] = [0] * n_roads
+        # Waiting-count / wait-time accumulators filled by the tracking pass,
+        # so compute_metrics is pure arithmetic with no per-vehicle loops
+        self._waiting_count_acc: List[int] = [0] * n_roads
+        self._wait_sum_acc: List[float] = [0.0] * n_roads
+        self._wait_n_acc: List[int] = [0] * n_roads
+        # Metrics cache: rebuilt only after a tracking/signal mutation, so
+        # callers polling faster than the simulation steps get the cached set
+        self._cached_metrics: Optional[RoadMetricsSet] = None
+        self._metrics_dirty: bool = True
         
         # Link mapping per junction
         self._link_to_edge: Dict[str, Dict[int, str]] = defaultdict(dict)
         self._edge_to_links: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        # Vectorized link views built once per connect: an all-red state
+        # template per junction plus one boolean mask per (junction, edge)
+        # selecting that edge's link positions in the state string
+        self._red_template: Dict[str, np.ndarray] = {}
+        self._edge_link_masks: Dict[str, Dict[str, np.ndarray]] = {}
         self._manual_last_effective_command: Optional[str] = None
         self._active_program_ids: Dict[str, str] = {}
+        # Memoized manual-command translation: the command vocabulary is tiny
+        # (NS_GREEN/EW_GREEN/...), so each distinct command resolves its edge
+        # group once instead of rebuilding a set per call
+        self._manual_edges_cache: Dict[str, frozenset] = {}
+
+        # Per-step subscription results (one batched TraCI pull per step
+        # instead of a fresh RPC for every edge/vehicle in every consumer)
+        self._edge_sub_results: Dict[str, Dict] = {}
+        self._veh_sub_results: Dict[str, Dict] = {}
+
+        # Emergency vehicles currently on an entry edge, classified when
+        # they first arrive in _update_vehicle_tracking
+        self._known_emergency_ids: Dict[str, Road] = {}
 
     def connect(self):
         """Start SUMO simulation via TraCI"""
@@ -71,90 +214,158 @@ class SUMOConnector:
         sumo_cmd = [sumo_binary, "-c", self.sumo_cfg, "--start", "--quit-on-end"]
         
         try:
-            traci.start(sumo_cmd)
+            self._traci.start(sumo_cmd)
             self.connected = True
-            print(f"✓ SUMO connected via TraCI (GUI={self.use_gui})")
+            logger.info("SUMO connected via TraCI (GUI=%s)", self.use_gui)
             
             # Setup traffic lights for all junctions
             for j_id in self.junction_ids:
-                logics = traci.trafficlight.getAllProgramLogics(j_id)
+                logics = self._traci.trafficlight.getAllProgramLogics(j_id)
                 if logics:
                     program_id = logics[0].programID
-                    traci.trafficlight.setProgram(j_id, program_id)
+                    self._traci.trafficlight.setProgram(j_id, program_id)
                     self._active_program_ids[j_id] = program_id
-                    print(f"✓ Using TLS program for {j_id}: {program_id}")
+                    logger.info("Using TLS program for %s: %s", j_id, program_id)
                 else:
-                    print(f"WARNING: No TLS program logics found for {j_id}")
+                    logger.warning("No TLS program logics found for %s", j_id)
             
             self._build_link_maps()
-            
+            self._subscribe_edges()
+
         except Exception as e:
-            print(f"✗ Failed to connect to SUMO: {e}")
+            logger.error("Failed to connect to SUMO: %s", e)
             raise
 
     def disconnect(self):
         """Close SUMO simulation"""
         if self.connected:
-            traci.close()
+            self._traci.close()
             self.connected = False
-            print("✓ SUMO disconnected")
+            logger.info("SUMO disconnected")
 
     def reset(self):
         """Reset simulation (reconnect)"""
         self.disconnect()
         self._t = 0
-        for road in self.edge_map.keys():
-            self.vehicle_waiting_times[road].clear()
-            self.vehicle_in_edge[road].clear()
-            self.arrival_history[road].clear()
-            self.departure_history[road].clear()
-            self.last_green_time[road] = -9999
-            self.cleared_last_interval[road] = 0
+        self._vehicles.clear()
+        self._id2int.clear()
+        self._int2id.clear()
+        self._free_handles.clear()
+        for i in range(len(self._road_edge_pairs)):
+            self.vehicle_in_edge[i] = np.empty(0, dtype=np.int64)
+            self.arrival_history[i].clear()
+            self.departure_history[i].clear()
+            self.arrival_window_sum[i] = 0
+            self.departure_window_sum[i] = 0
+            self.last_green_time[i] = -9999
+            self.cleared_last_interval[i] = 0
+            self._waiting_count_acc[i] = 0
+            self._wait_sum_acc[i] = 0.0
+            self._wait_n_acc[i] = 0
+        self._known_emergency_ids.clear()
+        self._cached_metrics = None
+        self._metrics_dirty = True
         self.connect()
 
+    def _subscribe_edges(self):
+        """Register edge subscriptions so step() gets all vehicle lists in one pull."""
+        for edge_id in self.edge_map.values():
+            try:
+                self._traci.edge.subscribe(edge_id, [tc.LAST_STEP_VEHICLE_ID_LIST, tc.LAST_STEP_VEHICLE_NUMBER])
+            except Exception as e:
+                logger.warning("Could not subscribe to edge %s: %s", edge_id, e)
+
+    def _edge_vehicle_ids(self, edge_id: str) -> List[str]:
+        """Vehicle IDs on an edge from the cached subscription result for this step."""
+        sub = self._edge_sub_results.get(edge_id)
+        if sub is not None and tc.LAST_STEP_VEHICLE_ID_LIST in sub:
+            return sub[tc.LAST_STEP_VEHICLE_ID_LIST]
+        # Fallback if the subscription is missing (e.g. before the first step)
+        return self._traci.edge.getLastStepVehicleIDs(edge_id)
+
+    def _subscribe_vehicle(self, veh_id: str):
+        """Subscribe a newly seen vehicle so its speed/type come in the batch pull."""
+        try:
+            self._traci.vehicle.subscribe(
+                veh_id, (tc.VAR_SPEED, tc.VAR_TYPE, tc.VAR_VEHICLECLASS)
+            )
+        except Exception:
+            pass  # Vehicle may already have left the simulation
+
+    def _vehicle_speed(self, veh_id: str) -> float:
+        """Speed from the cached vehicle subscription, with a direct-call fallback."""
+        sub = self._veh_sub_results.get(veh_id)
+        if sub is not None and tc.VAR_SPEED in sub:
+            return sub[tc.VAR_SPEED]
+        return self._traci.vehicle.getSpeed(veh_id)
+
+    def _vehicle_type(self, veh_id: str) -> str:
+        """Type ID from the cached vehicle subscription, with a direct-call fallback."""
+        sub = self._veh_sub_results.get(veh_id)
+        if sub is not None and tc.VAR_TYPE in sub:
+            return sub[tc.VAR_TYPE]
+        return self._traci.vehicle.getTypeID(veh_id)
+
+    def _vehicle_class(self, veh_id: str) -> str:
+        """Vehicle class from the cached vehicle subscription, with a direct-call fallback."""
+        sub = self._veh_sub_results.get(veh_id)
+        if sub is not None and tc.VAR_VEHICLECLASS in sub:
+            return sub[tc.VAR_VEHICLECLASS]
+        return self._traci.vehicle.getVehicleClass(veh_id)
+
     def step(self):
         """Advance SUMO simulation by one step"""
         if not self.connected:
             raise RuntimeError("SUMO not connected")
-        traci.simulationStep()
+        self._traci.simulationStep()
+        self._edge_sub_results = self._traci.edge.getAllSubscriptionResults()
+        self._veh_sub_results = self._traci.vehicle.getAllSubscriptionResults()
         self._t += 1
         self._update_vehicle_tracking()
 
     def get_counts(self) -> TrafficCounts:
         """Count vehicles on each incoming edge by type."""
-        counts = {
-            road: {"car": 0, "bike": 0, "bus": 0, "truck": 0, "lorry": 0, "auto": 0}
-            for road in self.edge_map.keys()
-        }
-
-        for road, edge_id in self.edge_map.items():
+        # Bucket straight into a (roads, types) int array; the double dict
+        # lookup per vehicle becomes one strided array increment
+        buckets = np.zeros((len(self._road_edge_pairs), len(_TYPE_ORDER)), dtype=np.int32)
+
+        # Hoist the bound methods out of the per-vehicle loop (LOAD_FAST vs.
+        # repeated attribute lookups per vehicle)
+        edge_vehicle_ids = self._edge_vehicle_ids
+        vehicle_type = self._vehicle_type
+        vehicle_class = self._vehicle_class
+        type_index_get = _TYPE_INDEX.get
+        class_to_type_idx = self._class_to_type_idx
+
+        for road_i, (road, edge_id) in enumerate(self._road_edge_pairs):
+            row = buckets[road_i]
             try:
-                vehicle_ids = traci.edge.getLastStepVehicleIDs(edge_id)
-                for veh_id in vehicle_ids:
+                for veh_id in edge_vehicle_ids(edge_id):
                     # Prefer exact type ID matching the route file
-                    veh_type = traci.vehicle.getTypeID(veh_id)
-                    if veh_type not in counts[road]:
-                        # Fallback to class mapping
-                        veh_class = traci.vehicle.getVehicleClass(veh_id)
-                        veh_type = self.type_map.get(veh_class, "car")
-                    
-                    if veh_type in counts[road]:
-                        counts[road][veh_type] += 1
-            except Exception as e:
+                    type_idx = type_index_get(vehicle_type(veh_id))
+                    if type_idx is None:
+                        # Fallback to class mapping ("car" default)
+                        type_idx = class_to_type_idx[vehicle_class(veh_id)]
+                    row[type_idx] += 1
+            except Exception:
                 pass # Ignore if edge is missing or vehicle departed
 
+        road_idx = self._road_idx
+        def row_counts(road: Road) -> RoadVehicleCounts:
+            return RoadVehicleCounts(*(int(c) for c in buckets[road_idx[road]]))
+
         return TrafficCounts(
-            west_entry=RoadVehicleCounts(**counts[Road.west_entry]),
-            j1_north_entry=RoadVehicleCounts(**counts[Road.j1_north_entry]),
-            j8_north_entry=RoadVehicleCounts(**counts[Road.j8_north_entry]),
-            j8_east_entry=RoadVehicleCounts(**counts[Road.j8_east_entry]),
-            j8_south_entry=RoadVehicleCounts(**counts[Road.j8_south_entry]),
+            west_entry=row_counts(Road.west_entry),
+            j1_north_entry=row_counts(Road.j1_north_entry),
+            j8_north_entry=row_counts(Road.j8_north_entry),
+            j8_east_entry=row_counts(Road.j8_east_entry),
+            j8_south_entry=row_counts(Road.j8_south_entry),
         )
 
     def detect_emergency(self) -> EmergencyInfo:
         for road, edge_id in self.edge_map.items():
             try:
-                vehicle_ids = traci.edge.getLastStepVehicleIDs(edge_id)
+                vehicle_ids = self._edge_vehicle_ids(edge_id)
                 for veh_id in vehicle_ids:
                     if "emergency" in veh_id.lower() or "ambulance" in veh_id.lower():
                         return EmergencyInfo(active=True, road=road)
@@ -166,9 +377,11 @@ class SUMOConnector:
         """Build mapping between controlled link indices and incoming edges per junction."""
         self._link_to_edge.clear()
         self._edge_to_links.clear()
+        self._red_template.clear()
+        self._edge_link_masks.clear()
         for j_id in self.junction_ids:
             try:
-                controlled_links = traci.trafficlight.getControlledLinks(j_id)
+                controlled_links = self._traci.trafficlight.getControlledLinks(j_id)
                 for link_idx, link_data in enumerate(controlled_links):
                     if not link_data:
                         continue
@@ -176,8 +389,22 @@ class SUMOConnector:
                     edge_id = incoming_lane.rsplit('_', 1)[0]
                     self._link_to_edge[j_id][link_idx] = edge_id
                     self._edge_to_links[j_id][edge_id].append(link_idx)
+
+                # Precompute the vectorized views: the all-red byte template
+                # sized to this junction's link count, and a boolean mask per
+                # edge selecting its link positions. State building and green
+                # checks then become masked array ops over uint8 bytes
+                # instead of per-character Python loops.
+                link_count = len(controlled_links)
+                self._red_template[j_id] = np.full(link_count, _ORD_r, dtype=np.uint8)
+                masks: Dict[str, np.ndarray] = {}
+                for edge_id, links in self._edge_to_links[j_id].items():
+                    mask = np.zeros(link_count, dtype=bool)
+                    mask[links] = True
+                    masks[edge_id] = mask
+                self._edge_link_masks[j_id] = masks
             except Exception as e:
-                print(f"WARNING: Could not build controlled-link map for {j_id}: {e}")
+                logger.warning("Could not build controlled-link map for %s: %s", j_id, e)
 
     def _road_to_edge(self, road: Road) -> str:
         return self.edge_map[road]
@@ -189,38 +416,43 @@ class SUMOConnector:
         return None
 
     def _build_custom_state(self, j_id: str, green_edges: Set[str]) -> str:
-        link_map = self._link_to_edge.get(j_id, {})
-        link_count = max(len(link_map), 0)
-        if link_count == 0:
-            link_count = len(traci.trafficlight.getRedYellowGreenState(j_id))
-            
-        state_chars = ['r'] * link_count
-        for idx, edge_id in link_map.items():
-            if edge_id in green_edges and idx < len(state_chars):
-                state_chars[idx] = 'G'
-        return ''.join(state_chars)
+        template = self._red_template.get(j_id)
+        if template is None or template.size == 0:
+            link_count = len(self._traci.trafficlight.getRedYellowGreenState(j_id))
+            template = np.full(link_count, _ORD_r, dtype=np.uint8)
+
+        # Copy the red template and flip each green edge's links in one
+        # masked write per edge
+        state = template.copy()
+        masks = self._edge_link_masks.get(j_id, {})
+        for edge_id in green_edges:
+            mask = masks.get(edge_id)
+            if mask is not None:
+                state[mask] = _ORD_G
+        return state.tobytes().decode('ascii')
 
     def _set_custom_green_edges(self, green_edges: Set[str], duration: int, effective_command: str):
         """Apply green state across all relevant junctions"""
         try:
             for j_id in self.junction_ids:
                 state = self._build_custom_state(j_id, green_edges)
-                traci.trafficlight.setRedYellowGreenState(j_id, state)
-                traci.trafficlight.setPhaseDuration(j_id, max(1, duration))
+                self._traci.trafficlight.setRedYellowGreenState(j_id, state)
+                self._traci.trafficlight.setPhaseDuration(j_id, max(1, duration))
             
             self._manual_last_effective_command = effective_command
+            self._metrics_dirty = True
 
-            active_roads = []
             for edge in green_edges:
-                road_name = self._edge_to_road_name(edge)
-                if road_name:
-                    active_roads.append(road_name)
-                    for road, mapped_edge in self.edge_map.items():
-                        if mapped_edge == edge:
-                            self.last_green_time[road] = self._t
-            print(f"✓ Applied custom state {effective_command}: roads={active_roads}")
+                for road, mapped_edge in self._road_edge_pairs:
+                    if mapped_edge == edge:
+                        self.last_green_time[self._road_idx[road]] = self._t
+            if self.debug:
+                active_roads = [
+                    name for name in map(self._edge_to_road_name, green_edges) if name
+                ]
+                logger.info("Applied custom state %s: roads=%s", effective_command, active_roads)
         except Exception as e:
-            print(f"Warning: Could not apply custom green edges {green_edges}: {e}")
+            logger.warning("Could not apply custom green edges %s: %s", green_edges, e)
 
     def apply_manual_command(self, command: str, duration: int):
         normalized = (command or '').upper()
@@ -232,29 +464,34 @@ class SUMOConnector:
 
         # Translate semantic commands to specific roads depending on the new mapping.
         # Since the new map is asymmetrical, NS/EW fallback to specific edges.
-        edges = set()
-        if "N" in normalized or "NS" in normalized:
-            edges.add(self._road_to_edge(Road.j1_north_entry))
-            edges.add(self._road_to_edge(Road.j8_north_entry))
-        if "S" in normalized or "NS" in normalized:
-            edges.add(self._road_to_edge(Road.j8_south_entry))
-        if "E" in normalized or "EW" in normalized:
-            edges.add(self._road_to_edge(Road.j8_east_entry))
-        if "W" in normalized or "EW" in normalized:
-            edges.add(self._road_to_edge(Road.west_entry))
+        edges = self._manual_edges_cache.get(normalized)
+        if edges is None:
+            resolved = set()
+            if "N" in normalized or "NS" in normalized:
+                resolved.add(self._road_to_edge(Road.j1_north_entry))
+                resolved.add(self._road_to_edge(Road.j8_north_entry))
+            if "S" in normalized or "NS" in normalized:
+                resolved.add(self._road_to_edge(Road.j8_south_entry))
+            if "E" in normalized or "EW" in normalized:
+                resolved.add(self._road_to_edge(Road.j8_east_entry))
+            if "W" in normalized or "EW" in normalized:
+                resolved.add(self._road_to_edge(Road.west_entry))
+            edges = frozenset(resolved)
+            self._manual_edges_cache[normalized] = edges
 
         self._set_custom_green_edges(edges, duration, normalized)
 
     def set_all_red(self, duration: int = 1):
         try:
             for j_id in self.junction_ids:
-                current_len = len(traci.trafficlight.getRedYellowGreenState(j_id))
+                current_len = len(self._traci.trafficlight.getRedYellowGreenState(j_id))
                 all_red_state = "r" * current_len
-                traci.trafficlight.setRedYellowGreenState(j_id, all_red_state)
-                traci.trafficlight.setPhaseDuration(j_id, max(1, duration))
+                self._traci.trafficlight.setRedYellowGreenState(j_id, all_red_state)
+                self._traci.trafficlight.setPhaseDuration(j_id, max(1, duration))
             self._manual_last_effective_command = "ALL_RED"
+            self._metrics_dirty = True
         except Exception as e:
-            print(f"Warning: Could not set all-red phase: {e}")
+            logger.warning("Could not set all-red phase: %s", e)
 
     def set_green_phase(self, road: Road, duration: int):
         """
@@ -264,81 +501,145 @@ class SUMOConnector:
             edge_id = self._road_to_edge(road)
             self._set_custom_green_edges({edge_id}, duration, f"AUTO_{road.value}")
         except Exception as e:
-            print(f"Warning: Could not set green phase for {road}: {e}")
+            logger.warning("Could not set green phase for %s: %s", road, e)
 
     def _update_vehicle_tracking(self):
-        for road, edge_id in self.edge_map.items():
+        self._metrics_dirty = True
+        # Locals for the per-vehicle work below
+        edge_vehicle_ids = self._edge_vehicle_ids
+        vehicle_speed = self._vehicle_speed
+        speed_threshold = self.WAITING_SPEED_THRESHOLD
+        for road_i, (road, edge_id) in enumerate(self._road_edge_pairs):
             try:
-                current_vehicles = set(traci.edge.getLastStepVehicleIDs(edge_id))
-                previous_vehicles = self.vehicle_in_edge[road]
-                
-                departures = previous_vehicles - current_vehicles
-                self.cleared_last_interval[road] = len(departures)
-                for _ in departures:
-                    self.departure_history[road].append(self._time_sec)
-                
-                arrivals = current_vehicles - previous_vehicles
-                for _ in arrivals:
-                    self.arrival_history[road].append(self._time_sec)
-                
-                for veh_id in current_vehicles:
-                    try:
-                        speed = traci.vehicle.getSpeed(veh_id)
-                        is_waiting = speed < self.WAITING_SPEED_THRESHOLD
-                        
-                        if veh_id not in self.vehicle_waiting_times[road]:
-                            self.vehicle_waiting_times[road][veh_id] = 0.0
-                        
-                        if is_waiting:
-                            self.vehicle_waiting_times[road][veh_id] += 1.0
-                    except Exception:
-                        pass
-                
+                current_vehicles = edge_vehicle_ids(edge_id)
+
+                # Intern IDs to dense ints; the arrival/departure diff then
+                # runs over sorted int64 arrays instead of string sets
+                id2int = self._id2int
+                int2id = self._int2id
+                free_handles = self._free_handles
+                cur = np.empty(len(current_vehicles), dtype=np.int64)
+                for k, veh_id in enumerate(current_vehicles):
+                    handle = id2int.get(veh_id)
+                    if handle is None:
+                        if free_handles:
+                            handle = free_handles.pop()
+                            int2id[handle] = veh_id
+                        else:
+                            handle = len(int2id)
+                            int2id.append(veh_id)
+                        id2int[veh_id] = handle
+                    cur[k] = handle
+                cur.sort()
+                prev = self.vehicle_in_edge[road_i]
+
+                departures = [int2id[h] for h in np.setdiff1d(prev, cur, assume_unique=True)]
+                self.cleared_last_interval[road_i] = len(departures)
+                arrivals = [int2id[h] for h in np.setdiff1d(cur, prev, assume_unique=True)]
+                for veh_id in arrivals:
+                    self._subscribe_vehicle(veh_id)
+                    self._vehicles.add(veh_id, road_i)
+                    if _EMERGENCY_RE.search(veh_id) or self._vehicle_type(veh_id) in _EMERGENCY_TYPES:
+                        self._known_emergency_ids[veh_id] = road
+
+                # One count per second per road; evict the count falling out
+                # of the window from the running sum before appending
+                arr_hist = self.arrival_history[road_i]
+                if len(arr_hist) == arr_hist.maxlen:
+                    self.arrival_window_sum[road_i] -= arr_hist[0]
+                arr_hist.append(len(arrivals))
+                self.arrival_window_sum[road_i] += len(arrivals)
+
+                dep_hist = self.departure_history[road_i]
+                if len(dep_hist) == dep_hist.maxlen:
+                    self.departure_window_sum[road_i] -= dep_hist[0]
+                dep_hist.append(len(departures))
+                self.departure_window_sum[road_i] += len(departures)
+
+                # Bump the wait counter of every waiting vehicle in one
+                # masked array add over the SoA table, and fill the metrics
+                # accumulators in the same pass (compute_metrics used to
+                # rescan the vehicle list and speeds a second time)
+                n_veh = len(current_vehicles)
+                waiting_count = 0
+                wait_sum = 0.0
+                wait_n = 0
+                if n_veh:
+                    id_to_row = self._vehicles.id_to_row
+                    rows = np.fromiter(
+                        (id_to_row.get(v, -1) for v in current_vehicles),
+                        dtype=np.int64,
+                        count=n_veh,
+                    )
+                    speeds = np.fromiter(
+                        (vehicle_speed(v) for v in current_vehicles),
+                        dtype=np.float32,
+                        count=n_veh,
+                    )
+                    slow = speeds < speed_threshold
+                    self._vehicles.wait[rows[(rows >= 0) & slow]] += 1.0
+                    waiting_count = int(np.count_nonzero(slow))
+                    tracked_rows = rows[rows >= 0]
+                    wait_sum = float(self._vehicles.wait[tracked_rows].sum())
+                    wait_n = int(tracked_rows.size)
+                self._waiting_count_acc[road_i] = waiting_count
+                self._wait_sum_acc[road_i] = wait_sum
+                self._wait_n_acc[road_i] = wait_n
+
+                # Release departed vehicles: the tracked edges are one-way
+                # boundary approaches, so a departed handle cannot reappear —
+                # free it for reuse instead of letting the tables grow with
+                # every vehicle ever seen
                 for veh_id in departures:
-                    if veh_id in self.vehicle_waiting_times[road]:
-                        del self.vehicle_waiting_times[road][veh_id]
-                
-                self.vehicle_in_edge[road] = current_vehicles
+                    self._vehicles.remove(veh_id)
+                    self._known_emergency_ids.pop(veh_id, None)
+                    handle = id2int.pop(veh_id, None)
+                    if handle is not None:
+                        int2id[handle] = None
+                        free_handles.append(handle)
+
+                self.vehicle_in_edge[road_i] = cur
             except Exception:
                 pass
     
     def compute_metrics(self) -> RoadMetricsSet:
+        # Nothing changed since the last build: hand back the cached set
+        if not self._metrics_dirty and self._cached_metrics is not None:
+            return self._cached_metrics
+
         metrics = {}
-        for road in self.edge_map.keys():
-            edge_id = self.edge_map[road]
-            try:
-                current_vehicles = traci.edge.getLastStepVehicleIDs(edge_id)
-            except Exception:
-                current_vehicles = []
-            
-            waiting_count = sum(1 for veh_id in current_vehicles if traci.vehicle.getSpeed(veh_id) < self.WAITING_SPEED_THRESHOLD)
-            wait_times = self.vehicle_waiting_times[road]
-            avg_wait_time = sum(wait_times.values()) / len(wait_times) if wait_times else 0.0
-            
-            window_start = self._t - 60
-            arrivals_in_window = sum(1 for t in self.arrival_history[road] if t > window_start)
-            departures_in_window = sum(1 for t in self.departure_history[road] if t > window_start)
-            
-            time_window_minutes = max(1.0, (self._t - window_start) / 60.0)
+        for road_i, (road, edge_id) in enumerate(self._road_edge_pairs):
+            # The tracking pass already counted waiters and summed wait times
+            # while it had the vehicles in hand; here it is scalar reads only
+            waiting_count = self._waiting_count_acc[road_i]
+            wait_n = self._wait_n_acc[road_i]
+            avg_wait_time = self._wait_sum_acc[road_i] / wait_n if wait_n else 0.0
+
+            arrivals_in_window = self.arrival_window_sum[road_i]
+            departures_in_window = self.departure_window_sum[road_i]
+
+            time_window_minutes = max(1.0, self.RATE_WINDOW_SEC / 60.0)
             metrics[road] = RoadMetrics(
                 waiting_count=waiting_count,
                 avg_wait_time=round(avg_wait_time, 2),
-                cleared_last_interval=self.cleared_last_interval[road],
+                cleared_last_interval=self.cleared_last_interval[road_i],
                 arrival_rate_vpm=round(arrivals_in_window / time_window_minutes, 2),
                 departure_rate_vpm=round(departures_in_window / time_window_minutes, 2),
-                time_since_last_green=round(self._t - self.last_green_time[road], 2),
+                time_since_last_green=round(self._t - self.last_green_time[road_i], 2),
                 congestion_percent=round(min(100.0, (waiting_count / self.MAX_QUEUE_PER_ROAD) * 100.0), 2),
                 eta_clear_seconds=round(waiting_count / max(departures_in_window / time_window_minutes / 60.0, 0.1), 2),
             )
-            self.cleared_last_interval[road] = 0
+            self.cleared_last_interval[road_i] = 0
             
-        return RoadMetricsSet(
+        self._cached_metrics = RoadMetricsSet(
             west_entry=metrics[Road.west_entry],
             j1_north_entry=metrics[Road.j1_north_entry],
             j8_north_entry=metrics[Road.j8_north_entry],
             j8_east_entry=metrics[Road.j8_east_entry],
             j8_south_entry=metrics[Road.j8_south_entry],
         )
+        self._metrics_dirty = False
+        return self._cached_metrics
 
     @property
     def current_time(self) -> int:
@@ -352,53 +653,61 @@ class SUMOConnector:
         if not self.connected:
             return False
         try:
-            return traci.simulation.getMinExpectedNumber() > 0
+            return self._traci.simulation.getMinExpectedNumber() > 0
         except Exception:
             return False
 
     def detect_emergency(self) -> EmergencyInfo:
         """
-        Scan all entry roads for emergency vehicles (police, ambulance, firetruck).
-        """
-        active_emergency = False
-        emergency_road = None
+        Report emergency vehicles (police, ambulance, firetruck) on entry roads.
 
-        for road, edge_id in self.edge_map.items():
-            try:
-                vehicle_ids = traci.edge.getLastStepVehicleIDs(edge_id)
-                for veh_id in vehicle_ids:
-                    vtype = traci.vehicle.getTypeID(veh_id)
-                    if vtype in ["police", "ambulance", "firetruck"]:
-                        active_emergency = True
-                        emergency_road = road
-                        break
-                if active_emergency:
-                    break
-            except Exception:
-                pass
+        Vehicles are classified once on arrival in _update_vehicle_tracking
+        (by ID pattern and vehicle type), so this is a plain dict check with
+        no per-step edge scans or TraCI calls.
+        """
+        if self._known_emergency_ids:
+            road = next(iter(self._known_emergency_ids.values()))
+            return EmergencyInfo(active=True, road=road)
+        return EmergencyInfo(active=False, road=None)
 
-        return EmergencyInfo(active=active_emergency, road=emergency_road)
+    @staticmethod
+    def _green_state_mask(state: str) -> np.ndarray:
+        """Boolean mask of green ('G'/'g') positions in a TLS state string."""
+        state_arr = np.frombuffer(state.encode('ascii'), dtype=np.uint8)
+        return (state_arr == _ORD_G) | (state_arr == _ORD_g)
 
     def _is_edge_green(self, edge_id: str) -> bool:
         """Checks if any traffic light link for this edge is currently green across any controlled junction."""
         try:
             for j_id in self.junction_ids:
-                state = traci.trafficlight.getRedYellowGreenState(j_id)
-                links = self._edge_to_links.get(j_id, {}).get(edge_id, [])
-                for link_idx in links:
-                    if link_idx < len(state) and state[link_idx] in ('G', 'g'):
-                        return True
+                mask = self._edge_link_masks.get(j_id, {}).get(edge_id)
+                if mask is None:
+                    continue
+                green = self._green_state_mask(self._traci.trafficlight.getRedYellowGreenState(j_id))
+                n = min(mask.size, green.size)
+                if green[:n][mask[:n]].any():
+                    return True
         except Exception:
             pass
         return False
 
     def get_actual_green_roads(self) -> List[str]:
         """Returns semantic road IDs that are currently green."""
-        green_roads = []
-        for road, edge_id in self.edge_map.items():
-            if self._is_edge_green(edge_id):
-                green_roads.append(road.value)
-        return green_roads
+        # One state fetch per junction, then a masked any() per edge — the
+        # per-road _is_edge_green loop refetched every junction state per road
+        green_edges: Set[str] = set()
+        for j_id in self.junction_ids:
+            try:
+                green = self._green_state_mask(self._traci.trafficlight.getRedYellowGreenState(j_id))
+            except Exception:
+                continue
+            for edge_id, mask in self._edge_link_masks.get(j_id, {}).items():
+                if edge_id in green_edges:
+                    continue
+                n = min(mask.size, green.size)
+                if green[:n][mask[:n]].any():
+                    green_edges.add(edge_id)
+        return [road.value for road, edge_id in self._road_edge_pairs if edge_id in green_edges]
 
     def get_actual_green_group(self) -> str:
         """Returns the name of the last applied command or 'AUTO'."""
@@ -413,8 +722,8 @@ class SUMOConnector:
             actual_green_roads = self.get_actual_green_roads()
             
             if ref_junc in self.junction_ids:
-                state = traci.trafficlight.getRedYellowGreenState(ref_junc)
-                phase = traci.trafficlight.getPhase(ref_junc)
+                state = self._traci.trafficlight.getRedYellowGreenState(ref_junc)
+                phase = self._traci.trafficlight.getPhase(ref_junc)
                 return {
                     "sumo_phase_index": phase,
                     "sumo_tls_state": state,
@@ -435,8 +744,8 @@ class SUMOConnector:
         """Close TraCI connection safely."""
         if self.connected:
             try:
-                traci.close()
+                self._traci.close()
             except Exception:
                 pass
             self.connected = False
-            print("SUMO disconnected.")
+            logger.info("SUMO disconnected.")
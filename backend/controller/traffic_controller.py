@@ -1,8 +1,23 @@
 from typing import Dict, Optional, Tuple, Any
 
-from .state_models import Road, TrafficCounts, EmergencyInfo, DecisionInfo
+import numpy as np
+
+from .state_models import Road, TrafficCounts, EmergencyInfo, DecisionInfo, ROAD_ORDER, ROAD_GETTERS
 from .multi_agent_dqn import MultiAgentManager, example_junction_config
 
+# Vehicle-type order of the cached queue-weight vector
+_QUEUE_TYPE_ORDER = ("bike", "car", "auto", "bus", "truck", "lorry")
+
+# Queue weights (Sri Lanka-aware), frozen at module scope: the dict is kept
+# for display/config readers, the vector feeds the compute_queues matvec.
+_QUEUE_WEIGHTS = {"bike": 1, "car": 2, "auto": 2, "bus": 5, "truck": 4, "lorry": 4}
+_QUEUE_WEIGHT_VEC = np.array([_QUEUE_WEIGHTS[t] for t in _QUEUE_TYPE_ORDER], dtype=np.int32)
+
+# Approach keys in junction-config order; pairs with ROAD_GETTERS so
+# _build_obs does not rebuild the key->road map every tick.
+# IMPORTANT: must match the junction config order.
+_APPROACH_KEYS = ("W", "J1N", "J8N", "J8E", "J8S")
+
 
 class TrafficController:
     """
@@ -14,8 +29,8 @@ class TrafficController:
     """
 
     def __init__(self):
-        # Queue weights (Sri Lanka-aware)
-        self.weights = {"bike": 1, "car": 2, "auto": 2, "bus": 5, "truck": 4, "lorry": 4}
+        self.weights = _QUEUE_WEIGHTS
+        self._weight_vec = _QUEUE_WEIGHT_VEC
 
         # Signal state
         self.current_green: Road = Road.j8_south_entry
@@ -41,6 +56,11 @@ class TrafficController:
         # Junction ID (set to J1 for now; Nimz can extend to J2/J3 later)
         self.junction_id = "J1"
 
+        # Counts matrix cached by compute_queues, reused by _build_obs when
+        # both run against the same TrafficCounts instance in one tick
+        self._last_counts: Optional[TrafficCounts] = None
+        self._last_counts_mat: Optional[np.ndarray] = None
+
     def reset(self):
         self.current_green = Road.j8_south_entry
         self.remaining_green = 0
@@ -51,19 +71,19 @@ class TrafficController:
         Priority-weighted queue score (used for quick status display / debugging).
         DQN itself uses per-vehicle-type counts in `obs`.
         """
-        queues: Dict[Road, int] = {}
-        for road in Road:
-            rc = getattr(counts, road.value)
-            q = (
-                rc.bike * self.weights["bike"] +
-                rc.car * self.weights["car"] +
-                rc.auto * self.weights["auto"] +
-                rc.bus * self.weights["bus"] +
-                rc.truck * self.weights["truck"] +
-                rc.lorry * self.weights["lorry"]
-            )
-            queues[road] = int(q)
-        return queues
+        arr = np.array(
+            [
+                [rc.bike, rc.car, rc.auto, rc.bus, rc.truck, rc.lorry]
+                for rc in (get(counts) for get in ROAD_GETTERS)
+            ],
+            dtype=np.int32,
+        )
+        # Remember the matrix so _build_obs can reuse it for the same counts
+        # instead of traversing the roads a second time in the same tick
+        self._last_counts = counts
+        self._last_counts_mat = arr
+        q = arr @ self._weight_vec
+        return {road: int(score) for (road, _), score in zip(ROAD_ORDER, q)}
 
     def _build_obs(self, counts: TrafficCounts, emergency: EmergencyInfo) -> Dict[str, Any]:
         """
@@ -82,28 +102,25 @@ class TrafficController:
           "emergency_index": int
         }
         """
-        # Convert TrafficCounts into per-approach vehicle-type dict
+        # Convert TrafficCounts into per-approach vehicle-type dict. When
+        # compute_queues already built the counts matrix for this exact
+        # TrafficCounts instance this tick, rebuild the dicts from its rows
+        # and skip the second traversal of the per-road models.
         approaches = {}
-
-        # IMPORTANT: keys here must match your junction config order.
-        road_key_map = {
-            "W": Road.west_entry,
-            "J1N": Road.j1_north_entry,
-            "J8N": Road.j8_north_entry,
-            "J8E": Road.j8_east_entry,
-            "J8S": Road.j8_south_entry,
-        }
-        
-        for key, road in road_key_map.items():
-            rc = getattr(counts, road.value)
-            approaches[key] = {
-                "bike": int(rc.bike),
-                "car": int(rc.car),
-                "auto": int(rc.auto),
-                "bus": int(rc.bus),
-                "truck": int(rc.truck),
-                "lorry": int(rc.lorry),
-            }
+        if counts is self._last_counts and self._last_counts_mat is not None:
+            mat = self._last_counts_mat
+            for key, row in zip(_APPROACH_KEYS, mat.tolist()):
+                approaches[key] = dict(zip(_QUEUE_TYPE_ORDER, row))
+        else:
+            mat = np.array(
+                [
+                    [rc.bike, rc.car, rc.auto, rc.bus, rc.truck, rc.lorry]
+                    for rc in (get(counts) for get in ROAD_GETTERS)
+                ],
+                dtype=np.int32,
+            )
+            for key, row in zip(_APPROACH_KEYS, mat.tolist()):
+                approaches[key] = dict(zip(_QUEUE_TYPE_ORDER, row))
 
         current_green_index = self._road_to_idx.get(self.current_green, 2)  # default south
 
@@ -114,6 +131,9 @@ class TrafficController:
 
         return {
             "approaches": approaches,
+            # Prebuilt (approach, type) matrix in approach-key order so the
+            # agent's queue math can skip re-gathering the dicts above
+            "counts_matrix": mat,
             "current_green_index": int(current_green_index),
             "remaining_green": int(self.remaining_green),
             "emergency": em_active,
@@ -1,7 +1,12 @@
-import random
-from typing import Dict, Optional
+from typing import Optional
+
+import numpy as np
+
+from .state_models import TrafficCounts, RoadVehicleCounts, EmergencyInfo, Road, ROAD_ORDER
+
+# Column order of the base/sigma matrices (matches RoadVehicleCounts fields)
+_TYPE_ORDER = ("car", "bike", "bus", "truck", "lorry", "auto")
 
-from .state_models import TrafficCounts, RoadVehicleCounts, EmergencyInfo, Road
 
 class FakeYOLOGenerator:
     """
@@ -18,41 +23,36 @@ class FakeYOLOGenerator:
             road: {"car": 4, "bike": 2, "bus": 1, "truck": 1, "lorry": 0, "auto": 2}
             for road in Road
         }
+        # Matrix form of the profiles so one vectorized normal() draw covers
+        # all roads and types instead of a random.gauss call per cell
+        self._rng = np.random.default_rng()
+        self._base = np.array(
+            [[self._base_profiles[road][t] for t in _TYPE_ORDER] for road, _ in ROAD_ORDER],
+            dtype=np.float64,
+        )
+        self._sigma = np.maximum(1.0, self._base * 0.3)
 
     def reset(self):
         self._t = 0
 
-    def _rand_count(self, base: int) -> int:
-        # Random variation around base, non-negative
-        return max(0, int(random.gauss(mu=base, sigma=max(1, base * 0.3))))
+    def _sample_counts(self) -> TrafficCounts:
+        # One (roads, types) gaussian draw, clipped to non-negative ints
+        samples = self._rng.normal(self._base, self._sigma)
+        counts = np.maximum(samples, 0.0).astype(np.int64)
+        return TrafficCounts(
+            **{
+                name: RoadVehicleCounts(*(int(c) for c in row))
+                for (_, name), row in zip(ROAD_ORDER, counts)
+            }
+        )
 
     def next_counts(self) -> TrafficCounts:
         self._t += 1
-        road_counts = {}
-        for road, profile in self._base_profiles.items():
-            road_counts[road.value] = RoadVehicleCounts(
-                car=self._rand_count(profile["car"]),
-                bike=self._rand_count(profile["bike"]),
-                bus=self._rand_count(profile["bus"]),
-                truck=self._rand_count(profile["truck"]),
-                lorry=self._rand_count(profile["lorry"]),
-                auto=self._rand_count(profile["auto"]),
-            )
-        return TrafficCounts(**road_counts)
+        return self._sample_counts()
 
     def peek_counts(self) -> TrafficCounts:
         # Produce counts without advancing time
-        road_counts = {}
-        for road, profile in self._base_profiles.items():
-            road_counts[road.value] = RoadVehicleCounts(
-                car=self._rand_count(profile["car"]),
-                bike=self._rand_count(profile["bike"]),
-                bus=self._rand_count(profile["bus"]),
-                truck=self._rand_count(profile["truck"]),
-                lorry=self._rand_count(profile["lorry"]),
-                auto=self._rand_count(profile["auto"]),
-            )
-        return TrafficCounts(**road_counts)
+        return self._sample_counts()
 
     def current_emergency(self) -> EmergencyInfo:
         if self.emergency_at_sec is not None and self._t >= self.emergency_at_sec: